@@ -19,6 +19,7 @@ from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 from emergentintegrations.payments.stripe.checkout import StripeCheckout, CheckoutSessionResponse, CheckoutStatusResponse, CheckoutSessionRequest
 import hashlib
+import re
 
 # Import our custom utilities
 from models.payment import PaymentTransaction, PaymentCreateRequest, PaymentStatusResponse
@@ -205,6 +206,16 @@ def generate_payment_link(session_id: str, amount: float) -> str:
     payment_id = hashlib.md5(f"{session_id}{amount}".encode()).hexdigest()
     return f"https://astro-reader-1.preview.emergentagent.com/pay/{payment_id}"
 
+# Entity-tags in an If-None-Match list, weak (W/"...") or strong ("...")
+_ENTITY_TAG_RE = re.compile(r'(?:W/)?"[^"]*"')
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag, as RFC 9110 requires for If-None-Match"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in _ENTITY_TAG_RE.findall(if_none_match))
+
 def get_service_price(service_type: str) -> float:
     """Get pricing for different services"""
     prices = {
@@ -711,8 +722,9 @@ async def get_client_charts(
     return [AstroChart(**chart) for chart in charts]
 
 @api_router.post("/charts/{chart_id}/generate-map")
-async def generate_chart_map(chart_id: str, current_user: User = Depends(get_current_user)):
-    """Generate or regenerate the astrological map (SVG) for an existing chart"""
+async def generate_chart_map(chart_id: str, include_svg: bool = False, current_user: User = Depends(get_current_user)):
+    """Generate or regenerate the astrological map (SVG) for an existing chart.
+    With include_svg=1 the generated SVG is returned directly instead of a JSON status."""
     try:
         # Get the existing chart
         chart = await db.astro_charts.find_one({"id": chart_id})
@@ -779,6 +791,9 @@ async def generate_chart_map(chart_id: str, current_user: User = Depends(get_cur
             }}
         )
         
+        if include_svg and svg_content:
+            return Response(content=svg_content, media_type="image/svg+xml")
+        
         return {"message": "Chart map generated successfully", "has_svg": bool(svg_content)}
         
     except Exception as e:
@@ -946,6 +961,13 @@ async def create_tarot_reading(
     await db.tarot_readings.insert_one(reading.dict())
     return reading
 
+# ==================== HEALTH ROUTES ====================
+
+@api_router.api_route("/health", methods=["GET", "HEAD"])
+async def health():
+    """Liveness check that touches no database, for clients warming up a connection"""
+    return {"status": "ok"}
+
 # ==================== SERVICES ROUTES ====================
 
 @api_router.get("/services")
@@ -1083,7 +1105,7 @@ async def complete_payment(
         raise HTTPException(status_code=403, detail="Access denied")
     
     # Update session status
-    await db.sessions.update_one(
+    update_result = await db.sessions.update_one(
         {"id": session_id},
         {"$set": {
             "payment_status": "paid",
@@ -1123,7 +1145,12 @@ async def complete_payment(
     # Notify reader about payment completion
     await notify_reader(session_id, "Payment Completed")
     
-    return {"message": "Payment completed successfully", "status": "confirmed"}
+    # Echo the stored payment status so callers need not re-fetch the session to confirm it
+    return {
+        "message": "Payment completed successfully",
+        "status": "confirmed",
+        "payment_status": "paid" if update_result.matched_count else session.payment_status
+    }
 
 @api_router.get("/sessions", response_model=List[Session])
 async def get_sessions(current_user: User = Depends(get_current_user)):
@@ -1661,8 +1688,16 @@ async def get_all_users(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/admin/sessions")
-async def get_all_sessions(current_user: User = Depends(get_current_user)):
-    """Get all sessions for admin management"""
+async def get_all_sessions(
+    request: Request,
+    response: Response,
+    include_etag: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """Get all sessions for admin management.
+
+    The list's ETag is only computed when asked for, with include_etag=1 or an If-None-Match
+    header; the latter answers 304 when it matches."""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -1689,12 +1724,42 @@ async def get_all_sessions(current_user: User = Depends(get_current_user)):
                 # Fallback: return the document without _id
                 result_sessions.append(session_doc)
         
+        if_none_match = request.headers.get("if-none-match")
+        if include_etag or if_none_match is not None:
+            etag = '"' + hashlib.sha1(json.dumps(result_sessions, sort_keys=True, default=str).encode()).hexdigest() + '"'
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
         return result_sessions
         
     except Exception as e:
         print(f"❌ Get sessions failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/admin/sessions/{session_id}")
+async def get_session_admin(
+    session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get a single session for admin management, without listing every session"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    session_doc = await db.sessions.find_one({"id": session_id}, {"_id": 0})
+    if not session_doc:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    client = await db.users.find_one({"id": session_doc["client_id"]}, {"name": 1, "email": 1})
+    if client:
+        session_doc["client_name"] = client["name"]
+        session_doc["client_email"] = client["email"]
+    
+    try:
+        return Session(**session_doc).dict()
+    except Exception as model_error:
+        print(f"⚠️ Session model conversion failed: {model_error}")
+        return session_doc
+
 @api_router.put("/admin/sessions/{session_id}/status")
 async def update_session_status(
     session_id: str,
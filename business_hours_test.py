@@ -2,19 +2,84 @@
 
 import requests
 import sys
-import json
+import os
+import argparse
+import hashlib
+import orjson
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, BinaryIO
+
+CASSETTE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "business_hours_cassette.json")
+
+# Days needed to move a date onto a weekday, indexed by weekday (Mon=0..Sun=6):
+# weekdays stay put, Saturday and Sunday roll on to Monday
+_SKIP_TO_MON = (0, 0, 0, 0, 0, 2, 1)
+_SKIP_TO_SAT = (5, 4, 3, 2, 1, 0, 6)  # days from each weekday to the next Saturday
+
+# Template for session-creation payloads
+_BASE_PAYLOAD = {"service_type": "tarot-reading"}
+
+# Payload fields holding ISO session times
+_SLOT_FIELDS = ("start_at", "end_at")
+
+# Wall-clock times (HH:MM) used by the weekday tests, formatted once per run
+_WEEKDAY_TIMES = ("09:00", "10:00", "14:00", "15:00", "16:00", "16:59", "17:00", "17:01",
+                  "17:30", "17:59", "18:00", "18:01", "18:30")
+
+# Phrases in the rejection of a weekend booking
+_WEEKDAY_MARKERS = ("Monday through Friday", "weekday")
+
+
+def _next_weekday(start: datetime, days_ahead: int = 1) -> datetime:
+    """Return the date days_ahead after start, moved on to Monday if it falls on a weekend"""
+    candidate = start + timedelta(days=days_ahead)
+    return candidate + timedelta(days=_SKIP_TO_MON[candidate.weekday()])
+
+
+def _payload(start_at: str, end_at: str, msg: str) -> Dict[str, str]:
+    """Build a session-creation payload from the shared template"""
+    return {**_BASE_PAYLOAD, "start_at": start_at, "end_at": end_at, "client_message": msg}
+
+
+def _slot_key(iso: str) -> str:
+    """Date-independent form of a session time for cassette keys, e.g. 'weekday 17:30'"""
+    dt = datetime.fromisoformat(iso)
+    return f"{'weekend' if dt.weekday() >= 5 else 'weekday'} {dt:%H:%M}"
+
+
+def _detail(resp: Any) -> str:
+    """Return the error detail of an API response as a string"""
+    return str(resp.get("detail", "")) if isinstance(resp, dict) else ""
 
 class BusinessHoursValidationTester:
-    def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com"):
+    def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com",
+                 mode: Optional[str] = None, cassette_path: str = CASSETTE_PATH,
+                 results_path: str = "/app/business_hours_test_results.json"):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.token = None
         self.user_id = None
         self.tests_run = 0
         self.tests_passed = 0
-        self.test_results = []
+        self.mode = mode  # None (live), "record" or "replay"
+        self.cassette_path = cassette_path
+        self.cassette = {}
+        if mode == "replay":
+            with open(cassette_path, 'rb') as f:
+                self.cassette = orjson.loads(f.read())
+
+        # ISO timestamps on the next weekday, keyed by "HH:MM"
+        next_weekday = self.get_next_weekday()
+        self._iso = {
+            t: next_weekday.replace(hour=int(t[:2]), minute=int(t[3:]), second=0, microsecond=0).isoformat()
+            for t in _WEEKDAY_TIMES
+        }
+
+        # Results are appended to the file opened by stream_results as they are logged
+        self.results_path = results_path
+        self._results_fp: Optional[BinaryIO] = None
+        self._results_sep = b"\n    "  # written before the next streamed result
 
     def log_test(self, name: str, success: bool, details: str = "", response_data: Any = None):
         """Log test result"""
@@ -29,7 +94,9 @@ class BusinessHoursValidationTester:
             "response_data": response_data,
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(result)
+        if self._results_fp is not None:
+            self._results_fp.write(self._results_sep + orjson.dumps(result))
+            self._results_sep = b",\n    "
         
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} - {name}")
@@ -38,8 +105,27 @@ class BusinessHoursValidationTester:
         if not success and response_data:
             print(f"    Response: {response_data}")
 
+    @staticmethod
+    def _cassette_key(method: str, endpoint: str, data: Optional[Dict]) -> str:
+        """Key a request for the record/replay cassette"""
+        # Registration emails are unique per run, so they are left out of the key, and session
+        # times are keyed by day kind and clock time so a cassette still matches on later dates
+        body = None
+        if data:
+            body = {k: _slot_key(v) if k in _SLOT_FIELDS else v for k, v in data.items() if k != "email"}
+        body_hash = hashlib.blake2b(orjson.dumps(body), digest_size=16).hexdigest()
+        return f"{method} {endpoint} {body_hash}"
+
     def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200) -> tuple:
-        """Make HTTP request and return success status and response"""
+        """Make HTTP request (or replay a recorded one) and return success status and response"""
+        key = self._cassette_key(method, endpoint, data) if self.mode else None
+
+        if self.mode == "replay":
+            if key not in self.cassette:
+                return False, {"error": f"No recorded response for {method} {endpoint}"}
+            status_code, response_data = self.cassette[key]
+            return status_code == expected_status, response_data
+
         url = f"{self.api_url}/{endpoint}"
         headers = {'Content-Type': 'application/json'}
         
@@ -50,9 +136,9 @@ class BusinessHoursValidationTester:
             if method == 'GET':
                 response = requests.get(url, headers=headers, timeout=30)
             elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
+                response = requests.post(url, data=orjson.dumps(data), headers=headers, timeout=30)
             elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=30)
+                response = requests.put(url, data=orjson.dumps(data), headers=headers, timeout=30)
             elif method == 'DELETE':
                 response = requests.delete(url, headers=headers, timeout=30)
             else:
@@ -66,6 +152,9 @@ class BusinessHoursValidationTester:
             except:
                 response_data = {"status_code": response.status_code, "text": response.text}
 
+            if self.mode == "record":
+                self.cassette[key] = [response.status_code, response_data]
+
             return success, response_data
 
         except requests.exceptions.RequestException as e:
@@ -94,30 +183,22 @@ class BusinessHoursValidationTester:
 
     def get_next_weekday(self, days_ahead=1):
         """Get next weekday (Monday-Friday) for testing"""
-        date = datetime.now() + timedelta(days=days_ahead)
-        while date.weekday() > 4:  # Skip weekends (Saturday=5, Sunday=6)
-            date += timedelta(days=1)
-        return date
+        return _next_weekday(datetime.now(), days_ahead)
+
+    def _get_next_saturday(self):
+        """Get the next Saturday (starting from tomorrow) for testing"""
+        candidate = datetime.now() + timedelta(days=1)
+        return candidate + timedelta(days=_SKIP_TO_SAT[candidate.weekday()])
 
     def test_session_ending_after_6pm(self):
         """Test that sessions ending after 6:00 PM are rejected (5:30 PM - 6:30 PM should fail)"""
-        next_weekday = self.get_next_weekday()
-        
         # Create session from 5:30 PM to 6:30 PM (should fail - ends after 6 PM)
-        start_time = next_weekday.replace(hour=17, minute=30, second=0, microsecond=0)  # 5:30 PM
-        end_time = start_time + timedelta(hours=1)  # 6:30 PM
-        
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing 5:30 PM - 6:30 PM booking (should fail)"
-        }
+        session_data = _payload(self._iso["17:30"], self._iso["18:30"], "Testing 5:30 PM - 6:30 PM booking (should fail)")
         
         success, response = self.make_request('POST', 'sessions', session_data, 400)  # Expect 400 error
         
         # Check if the request was properly rejected (400 status) and contains the right error message
-        if response.get('status_code') == 400 and "6:00 PM" in str(response):
+        if response.get('status_code') == 400 and "6:00 PM" in _detail(response):
             self.log_test("Session Ending After 6 PM (5:30-6:30)", True, 
                          f"Correctly rejected session ending at 6:30 PM: {response.get('detail', 'Unknown error')}")
             return True
@@ -128,23 +209,13 @@ class BusinessHoursValidationTester:
 
     def test_session_ending_exactly_at_6pm(self):
         """Test that sessions ending exactly at 6:00 PM are rejected"""
-        next_weekday = self.get_next_weekday()
-        
         # Create session from 5:00 PM to 6:00 PM (should fail - ends exactly at 6 PM)
-        start_time = next_weekday.replace(hour=17, minute=0, second=0, microsecond=0)  # 5:00 PM
-        end_time = next_weekday.replace(hour=18, minute=0, second=0, microsecond=0)  # 6:00 PM
-        
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing 5:00 PM - 6:00 PM booking (should fail)"
-        }
+        session_data = _payload(self._iso["17:00"], self._iso["18:00"], "Testing 5:00 PM - 6:00 PM booking (should fail)")
         
         success, response = self.make_request('POST', 'sessions', session_data, 400)  # Expect 400 error
         
         # Check if the request was properly rejected (400 status) and contains the right error message
-        if response.get('status_code') == 400 and "6:00 PM" in str(response):
+        if response.get('status_code') == 400 and "6:00 PM" in _detail(response):
             self.log_test("Session Ending Exactly at 6 PM (5:00-6:00)", True, 
                          f"Correctly rejected session ending exactly at 6:00 PM: {response.get('detail', 'Unknown error')}")
             return True
@@ -155,18 +226,8 @@ class BusinessHoursValidationTester:
 
     def test_valid_session_before_6pm(self):
         """Test that valid sessions ending before 6:00 PM still work (4:00 PM - 5:00 PM should succeed)"""
-        next_weekday = self.get_next_weekday()
-        
         # Create session from 4:00 PM to 5:00 PM (should succeed - ends before 6 PM)
-        start_time = next_weekday.replace(hour=16, minute=0, second=0, microsecond=0)  # 4:00 PM
-        end_time = next_weekday.replace(hour=17, minute=0, second=0, microsecond=0)  # 5:00 PM
-        
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing 4:00 PM - 5:00 PM booking (should succeed)"
-        }
+        session_data = _payload(self._iso["16:00"], self._iso["17:00"], "Testing 4:00 PM - 5:00 PM booking (should succeed)")
         
         success, response = self.make_request('POST', 'sessions', session_data, 200)  # Expect success
         
@@ -181,23 +242,13 @@ class BusinessHoursValidationTester:
 
     def test_session_starting_before_10am(self):
         """Test that sessions starting before 10:00 AM are rejected"""
-        next_weekday = self.get_next_weekday()
-        
         # Create session from 9:00 AM to 10:00 AM (should fail - starts before 10 AM)
-        start_time = next_weekday.replace(hour=9, minute=0, second=0, microsecond=0)  # 9:00 AM
-        end_time = next_weekday.replace(hour=10, minute=0, second=0, microsecond=0)  # 10:00 AM
-        
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing 9:00 AM - 10:00 AM booking (should fail)"
-        }
+        session_data = _payload(self._iso["09:00"], self._iso["10:00"], "Testing 9:00 AM - 10:00 AM booking (should fail)")
         
         success, response = self.make_request('POST', 'sessions', session_data, 400)  # Expect 400 error
         
         # Check if the request was properly rejected (400 status) and contains the right error message
-        if response.get('status_code') == 400 and "10:00 AM" in str(response):
+        if response.get('status_code') == 400 and "10:00 AM" in _detail(response):
             self.log_test("Session Starting Before 10 AM", True, 
                          f"Correctly rejected session starting at 9:00 AM: {response.get('detail', 'Unknown error')}")
             return True
@@ -208,26 +259,19 @@ class BusinessHoursValidationTester:
 
     def test_weekend_session_rejection(self):
         """Test that weekend sessions are rejected"""
-        # Get next Saturday
-        date = datetime.now() + timedelta(days=1)
-        while date.weekday() != 5:  # Saturday = 5
-            date += timedelta(days=1)
+        date = self._get_next_saturday()
         
         # Create session on Saturday (should fail)
         start_time = date.replace(hour=14, minute=0, second=0, microsecond=0)  # 2:00 PM Saturday
         end_time = start_time + timedelta(hours=1)  # 3:00 PM Saturday
         
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing Saturday booking (should fail)"
-        }
+        session_data = _payload(start_time.isoformat(), end_time.isoformat(), "Testing Saturday booking (should fail)")
         
         success, response = self.make_request('POST', 'sessions', session_data, 400)  # Expect 400 error
         
         # Check if the request was properly rejected (400 status) and contains the right error message
-        if response.get('status_code') == 400 and ("Monday through Friday" in str(response) or "weekday" in str(response)):
+        detail = _detail(response)
+        if response.get('status_code') == 400 and any(s in detail for s in _WEEKDAY_MARKERS):
             self.log_test("Weekend Session Rejection", True, 
                          f"Correctly rejected Saturday session: {response.get('detail', 'Unknown error')}")
             return True
@@ -238,18 +282,8 @@ class BusinessHoursValidationTester:
 
     def test_valid_business_hours_session(self):
         """Test that sessions within valid business hours work correctly"""
-        next_weekday = self.get_next_weekday()
-        
         # Create session from 2:00 PM to 3:00 PM on weekday (should succeed)
-        start_time = next_weekday.replace(hour=14, minute=0, second=0, microsecond=0)  # 2:00 PM
-        end_time = next_weekday.replace(hour=15, minute=0, second=0, microsecond=0)  # 3:00 PM
-        
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing valid business hours session"
-        }
+        session_data = _payload(self._iso["14:00"], self._iso["15:00"], "Testing valid business hours session")
         
         success, response = self.make_request('POST', 'sessions', session_data, 200)  # Expect success
         
@@ -264,18 +298,8 @@ class BusinessHoursValidationTester:
 
     def test_edge_case_5_59_pm_end(self):
         """Test edge case: session ending at 5:59 PM (should succeed)"""
-        next_weekday = self.get_next_weekday()
-        
         # Create session from 4:59 PM to 5:59 PM (should succeed - ends before 6 PM)
-        start_time = next_weekday.replace(hour=16, minute=59, second=0, microsecond=0)  # 4:59 PM
-        end_time = next_weekday.replace(hour=17, minute=59, second=0, microsecond=0)  # 5:59 PM
-        
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing 4:59 PM - 5:59 PM booking (edge case)"
-        }
+        session_data = _payload(self._iso["16:59"], self._iso["17:59"], "Testing 4:59 PM - 5:59 PM booking (edge case)")
         
         success, response = self.make_request('POST', 'sessions', session_data, 200)  # Expect success
         
@@ -290,23 +314,13 @@ class BusinessHoursValidationTester:
 
     def test_edge_case_6_01_pm_end(self):
         """Test edge case: session ending at 6:01 PM (should fail)"""
-        next_weekday = self.get_next_weekday()
-        
         # Create session from 5:01 PM to 6:01 PM (should fail - ends after 6 PM)
-        start_time = next_weekday.replace(hour=17, minute=1, second=0, microsecond=0)  # 5:01 PM
-        end_time = next_weekday.replace(hour=18, minute=1, second=0, microsecond=0)  # 6:01 PM
-        
-        session_data = {
-            "service_type": "tarot-reading",
-            "start_at": start_time.isoformat(),
-            "end_at": end_time.isoformat(),
-            "client_message": "Testing 5:01 PM - 6:01 PM booking (should fail)"
-        }
+        session_data = _payload(self._iso["17:01"], self._iso["18:01"], "Testing 5:01 PM - 6:01 PM booking (should fail)")
         
         success, response = self.make_request('POST', 'sessions', session_data, 400)  # Expect 400 error
         
         # Check if the request was properly rejected (400 status) and contains the right error message
-        if response.get('status_code') == 400 and "6:00 PM" in str(response):
+        if response.get('status_code') == 400 and "6:00 PM" in _detail(response):
             self.log_test("Edge Case Session Ending at 6:01 PM", True, 
                          f"Correctly rejected session ending at 6:01 PM: {response.get('detail', 'Unknown error')}")
             return True
@@ -362,27 +376,56 @@ class BusinessHoursValidationTester:
             print("⚠️  Some business hours tests failed - check details above")
             return False
 
-    def save_results(self, filename: str = "/app/business_hours_test_results.json"):
-        """Save test results to file"""
-        results = {
-            "timestamp": datetime.now().isoformat(),
-            "test_focus": "Business Hours Validation Fix",
-            "fix_description": "Changed condition from end_datetime.hour > 18 to end_datetime.hour >= 18",
-            "total_tests": self.tests_run,
-            "passed_tests": self.tests_passed,
-            "success_rate": (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0,
-            "test_details": self.test_results
-        }
-        
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2)
+    @contextmanager
+    def stream_results(self, filename: Optional[str] = None):
+        """Stream results logged inside the block to file (results_path unless a filename is given)"""
+        filename = filename or self.results_path
+        with open(filename, 'wb') as f:
+            f.write(b'{\n  "test_details": [')
+            self._results_fp, self._results_sep = f, b"\n    "
+            try:
+                yield
+            finally:
+                self._results_fp = None
+                results = {
+                    "timestamp": datetime.now().isoformat(),
+                    "test_focus": "Business Hours Validation Fix",
+                    "fix_description": "Changed condition from end_datetime.hour > 18 to end_datetime.hour >= 18",
+                    "total_tests": self.tests_run,
+                    "passed_tests": self.tests_passed,
+                    "success_rate": (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0
+                }
+                # Close the test_details array and splice the summary keys in after it
+                f.write(b"\n  ]," + orjson.dumps(results, option=orjson.OPT_INDENT_2)[1:] + b"\n")
         
         print(f"📄 Test results saved to: {filename}")
 
+    def save_cassette(self):
+        """Write the recorded responses to the cassette file"""
+        os.makedirs(os.path.dirname(self.cassette_path), exist_ok=True)
+        with open(self.cassette_path, 'wb') as f:
+            f.write(orjson.dumps(self.cassette, option=orjson.OPT_INDENT_2))
+        
+        print(f"📼 Recorded {len(self.cassette)} responses to: {self.cassette_path}")
+
 def main():
-    tester = BusinessHoursValidationTester()
-    success = tester.run_business_hours_tests()
-    tester.save_results()
+    parser = argparse.ArgumentParser(description="Business hours validation tests")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", action="store_const", const="record", dest="mode",
+                      help="Run against the live API and record responses to the cassette")
+    mode.add_argument("--replay", action="store_const", const="replay", dest="mode",
+                      help="Serve responses from the recorded cassette instead of the network")
+    parser.add_argument("--results-path", default="/app/business_hours_test_results.json",
+                        help="Where to write the test results")
+    args = parser.parse_args()
+    if args.mode == "replay" and not os.path.exists(CASSETTE_PATH):
+        parser.error(f"no cassette at {CASSETTE_PATH} - run once with --record first")
+
+    tester = BusinessHoursValidationTester(mode=args.mode, results_path=args.results_path)
+    with tester.stream_results():
+        success = tester.run_business_hours_tests()
+    if args.mode == "record":
+        tester.save_cassette()
     
     return 0 if success else 1
 
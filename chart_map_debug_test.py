@@ -1,23 +1,82 @@
 #!/usr/bin/env python3
 
-import requests
+import aiohttp
+import asyncio
+import io
 import sys
-import json
+import orjson
 import os
+import re
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, NamedTuple
+
+# Fail fast on a stalled server instead of waiting 30s per call
+CONNECT_TIMEOUT, READ_TIMEOUT = 3.0, 10.0
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = frozenset({502, 503, 504})
+# Only these are retried on a gateway error, since the server may already have applied a POST
+RETRY_METHODS = frozenset({'GET', 'HEAD'})
+
+# Elements every rendered chart wheel is expected to contain
+SVG_TAGS = ('circle', 'path', 'text')
+_SVG_TAG_RE = re.compile(r'<(circle|path|text)')
+_SVG_TAG_RE_BYTES = re.compile(rb'<(circle|path|text)')
+
+# Phrases in a generate-map message that point at file system problems
+_FILE_ERR_RE = re.compile(r'permission|path|file not found|directory', re.IGNORECASE)
+
+
+def _find_svg_tags(content, found: Optional[set] = None) -> set:
+    """Add the SVG_TAGS occurring in ``content`` (str or bytes) to ``found`` in a single scan"""
+    found = set() if found is None else found
+    pattern = _SVG_TAG_RE_BYTES if isinstance(content, bytes) else _SVG_TAG_RE
+    for match in pattern.finditer(content):
+        tag = match.group(1)
+        found.add(tag.decode() if isinstance(tag, bytes) else tag)
+        if len(found) == len(SVG_TAGS):
+            break
+    return found
+
+class Node(NamedTuple):
+    """A test in the dependency graph run by ChartMapDebugTester._run_dag"""
+    name: str
+    deps: Tuple[str, ...]
+    coro_factory: Callable[[], Awaitable[Any]]
 
 class ChartMapDebugTester:
     def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com"):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.token = None
+        self._auth_headers: Optional[Dict[str, str]] = None  # rebuilt only when the token changes
         self.user_id = None
         self.tests_run = 0
         self.tests_passed = 0
         self.test_results = []
+        self._out = io.StringIO()  # per-phase output buffer, see _flush_output
         self.chart_id = None
+        self.chart_has_svg = False  # whether self.chart_id came back with SVG content
         self.birth_data_id = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        # User's charts keyed by id; reset to None whenever a chart is created
+        self._charts_by_id: Optional[Dict[str, Dict]] = None
+        self._charts_fetched_at = 0.0
+        # Results record a monotonic offset; wall-clock timestamps are derived on save
+        self._t0_wall = time.time()
+        self._t0_mono = time.monotonic()
+
+    @classmethod
+    def _summarize(cls, obj: Any, max_str: int = 512) -> Any:
+        """Replace long strings (e.g. chart_svg) in a response with a short summary"""
+        if isinstance(obj, str) and len(obj) > max_str:
+            return {"__truncated": True, "len": len(obj), "head": obj[:128]}
+        if isinstance(obj, dict):
+            return {k: cls._summarize(v, max_str) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [cls._summarize(v, max_str) for v in obj]
+        return obj
 
     def log_test(self, name: str, success: bool, details: str = "", response_data: Any = None):
         """Log test result"""
@@ -25,68 +84,103 @@ class ChartMapDebugTester:
         if success:
             self.tests_passed += 1
         
+        # Passing results keep a bounded summary; failures keep the full payload for diagnosis
         result = {
             "test_name": name,
             "success": success,
             "details": details,
-            "response_data": response_data,
-            "timestamp": datetime.now().isoformat()
+            "response_data": self._summarize(response_data) if success else response_data,
+            "t_mono": time.monotonic() - self._t0_mono
         }
         self.test_results.append(result)
         
         status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} - {name}")
+        lines = [f"{status} - {name}"]
         if details:
-            print(f"    Details: {details}")
+            lines.append(f"    Details: {details}")
         if not success and response_data:
-            print(f"    Response: {response_data}")
+            lines.append(f"    Response: {response_data}")
+        self._out.write("\n".join(lines) + "\n")
+
+    def _flush_output(self):
+        """Write the output buffered since the last phase boundary to stdout"""
+        sys.stdout.write(self._out.getvalue())
+        sys.stdout.flush()
+        self._out.seek(0)
+        self._out.truncate(0)
+
+    def _set_token(self, token: Optional[str]):
+        """Set the bearer token and the Authorization header sent with it"""
+        self.token = token
+        self._auth_headers = {'Authorization': f'Bearer {token}'} if token else None
+
+    async def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200,
+                           authenticated: bool = True, raw_body: Optional[bytes] = None) -> tuple:
+        """Make HTTP request on the shared session and return success status and response.
+
+        ``raw_body`` is a pre-serialized JSON body; otherwise ``data`` is encoded here, and
+        requests without a body are sent with an empty payload.
+        """
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return False, {"error": f"Unsupported method: {method}"}
+
+        if raw_body is None:
+            raw_body = orjson.dumps(data) if data is not None else b''
 
-    def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200) -> tuple:
-        """Make HTTP request and return success status and response"""
         url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
-        
-        if self.token:
-            headers['Authorization'] = f'Bearer {self.token}'
+        headers = self._auth_headers if authenticated else None
 
-        try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
-            else:
-                return False, {"error": f"Unsupported method: {method}"}
+        # Retry failed connects for any method (nothing reached the server), and gateway
+        # errors only for reads, so a retried POST cannot create a duplicate user or chart
+        retry_statuses = RETRY_STATUSES if method in RETRY_METHODS else frozenset()
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            retries_left = attempt < MAX_RETRIES
 
-            success = response.status_code == expected_status
-            
             try:
-                response_data = response.json()
-            except:
-                response_data = {"status_code": response.status_code, "text": response.text}
+                async with self.session.request(method, url, data=raw_body, headers=headers) as response:
+                    if response.status in retry_statuses and retries_left:
+                        continue
+
+                    success = response.status == expected_status
+                    content_type = response.headers.get('content-type', '')
+                    body = await response.read()
+                    
+                    # Dispatch on Content-Type rather than attempting (and failing) a JSON decode;
+                    # an empty or truncated JSON body falls back to the raw text
+                    response_data = None
+                    if content_type.startswith('application/json'):
+                        try:
+                            response_data = orjson.loads(body)
+                        except orjson.JSONDecodeError:
+                            pass
+                    if response_data is None:
+                        response_data = {"status_code": response.status, "text": body.decode('utf-8', errors='replace'),
+                                         "content_type": content_type}
 
-            return success, response_data
+                return success, response_data
 
-        except requests.exceptions.RequestException as e:
-            return False, {"error": str(e)}
+            except aiohttp.ClientConnectorError as e:
+                if not retries_left:
+                    return False, {"error": str(e)}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return False, {"error": str(e)}
 
-    def setup_authentication(self):
+    async def setup_authentication(self):
         """Setup authentication for testing"""
         test_email = f"chart_test_{datetime.now().strftime('%H%M%S')}@celestia.com"
-        register_data = {
+        register_body = orjson.dumps({
             "name": "Chart Test User",
             "email": test_email,
             "password": "ChartTest123!",
             "role": "client"
-        }
+        })
         
-        success, response = self.make_request('POST', 'auth/register', register_data, 200)
+        success, response = await self.make_request('POST', 'auth/register', None, 200, raw_body=register_body)
         
         if success and 'access_token' in response:
-            self.token = response['access_token']
+            self._set_token(response['access_token'])
             self.user_id = response['user']['id']
             self.log_test("Authentication Setup", True, f"Registered user: {test_email}")
             return True
@@ -94,18 +188,18 @@ class ChartMapDebugTester:
             self.log_test("Authentication Setup", False, "Failed to register user", response)
             return False
 
-    def create_birth_data(self):
+    async def create_birth_data(self):
         """Create birth data for chart generation"""
-        birth_data = {
+        birth_body = orjson.dumps({
             "birth_date": "1985-07-20",
             "birth_time": "10:30",
             "time_accuracy": "exact",
             "birth_place": "Los Angeles, CA",
             "latitude": "34.0522",
             "longitude": "-118.2437"
-        }
+        })
         
-        success, response = self.make_request('POST', 'birth-data', birth_data, 200)
+        success, response = await self.make_request('POST', 'birth-data', None, 200, raw_body=birth_body)
         
         if success and 'id' in response:
             self.birth_data_id = response['id']
@@ -115,38 +209,43 @@ class ChartMapDebugTester:
             self.log_test("Birth Data Creation", False, "Failed to create birth data", response)
             return False
 
-    def test_chart_generation_with_svg(self):
+    async def test_chart_generation_with_svg(self):
         """Test generating astrology chart with SVG content"""
         if not self.birth_data_id:
             self.log_test("Chart Generation with SVG", False, "No birth data available")
             return False
             
-        success, response = self.make_request('POST', f'astrology/chart?birth_data_id={self.birth_data_id}', None, 200)
+        success, response = await self.make_request('POST', f'astrology/chart?birth_data_id={self.birth_data_id}', None, 200)
         
         if success and 'id' in response:
             self.chart_id = response['id']
             
             # Check if chart has SVG content
             has_svg = 'chart_svg' in response and response['chart_svg'] is not None
+            self.chart_has_svg = has_svg
+            self._charts_by_id = None
             has_planets = 'planets' in response and len(response['planets']) > 0
             has_houses = 'houses' in response and len(response['houses']) > 0
             
-            details = f"Chart ID: {self.chart_id}"
-            details += f", Planets: {len(response.get('planets', {}))}"
-            details += f", Houses: {len(response.get('houses', {}))}"
-            details += f", Has SVG: {has_svg}"
+            parts = [
+                f"Chart ID: {self.chart_id}",
+                f"Planets: {len(response.get('planets', {}))}",
+                f"Houses: {len(response.get('houses', {}))}",
+                f"Has SVG: {has_svg}",
+            ]
             
             if has_svg:
                 svg_length = len(response['chart_svg'])
-                details += f", SVG Length: {svg_length} chars"
+                parts.append(f"SVG Length: {svg_length} chars")
                 
                 # Check if SVG contains expected astrological elements
-                svg_content = response['chart_svg']
-                has_circle = '<circle' in svg_content
-                has_path = '<path' in svg_content
-                has_text = '<text' in svg_content
+                found = _find_svg_tags(response['chart_svg'])
+                has_circle = 'circle' in found
+                has_path = 'path' in found
+                has_text = 'text' in found
                 
-                details += f", SVG Elements: circle={has_circle}, path={has_path}, text={has_text}"
+                parts.append(f"SVG Elements: circle={has_circle}, path={has_path}, text={has_text}")
+                details = ", ".join(parts)
                 
                 if svg_length > 1000 and has_circle and has_path:
                     self.log_test("Chart Generation with SVG", True, details)
@@ -155,19 +254,20 @@ class ChartMapDebugTester:
                     self.log_test("Chart Generation with SVG", False, f"SVG content appears incomplete: {details}")
                     return False
             else:
+                details = ", ".join(parts)
                 self.log_test("Chart Generation with SVG", False, f"No SVG content generated: {details}")
                 return False
         else:
             self.log_test("Chart Generation with SVG", False, "Failed to generate chart", response)
             return False
 
-    def test_chart_map_generation_endpoint(self):
+    async def test_chart_map_generation_endpoint(self):
         """Test the /api/charts/{chart_id}/generate-map endpoint"""
         if not self.chart_id:
             self.log_test("Chart Map Generation Endpoint", False, "No chart ID available")
             return False
         
-        success, response = self.make_request('POST', f'charts/{self.chart_id}/generate-map', None, 200)
+        success, response = await self.make_request('POST', f'charts/{self.chart_id}/generate-map', None, 200)
         
         if success and 'message' in response:
             has_svg = response.get('has_svg', False)
@@ -183,7 +283,28 @@ class ChartMapDebugTester:
             self.log_test("Chart Map Generation Endpoint", False, "Failed to generate map", response)
             return False
 
-    def test_svg_retrieval_endpoint(self):
+    @staticmethod
+    async def _scan_svg_stream(response: aiohttp.ClientResponse) -> tuple:
+        """Stream an SVG body, stopping as soon as every tag in SVG_TAGS has been seen.
+
+        Returns the set of tags found, the start of the body and the number of bytes read.
+        """
+        found = set()
+        head = b''
+        tail = b''  # end of the previous chunk, so tags split across chunks still match
+        bytes_read = 0
+        async for chunk in response.content.iter_chunked(8192):
+            if not bytes_read:
+                head = chunk[:64]
+            bytes_read += len(chunk)
+            window = tail + chunk
+            _find_svg_tags(window, found)
+            if len(found) == len(SVG_TAGS):
+                break
+            tail = window[-16:]
+        return found, head, bytes_read
+
+    async def test_svg_retrieval_endpoint(self):
         """Test the /api/charts/{chart_id}/svg endpoint"""
         if not self.chart_id:
             self.log_test("SVG Retrieval Endpoint", False, "No chart ID available")
@@ -191,26 +312,33 @@ class ChartMapDebugTester:
         
         # Make request expecting SVG content (not JSON)
         url = f"{self.api_url}/charts/{self.chart_id}/svg"
-        headers = {'Authorization': f'Bearer {self.token}'}
+        headers = self._auth_headers
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
+            async with self.session.get(url, headers=headers) as response:
+                status_code = response.status
                 content_type = response.headers.get('content-type', '')
-                svg_content = response.text
-                
+                if status_code == 200:
+                    found, head, bytes_read = await self._scan_svg_stream(response)
+                    # Without a Content-Length only the scanned prefix is known, which is a lower bound
+                    if response.content_length is not None:
+                        svg_length, length_text = response.content_length, str(response.content_length)
+                    else:
+                        svg_length, length_text = bytes_read, f"≥{bytes_read} bytes scanned"
+                else:
+                    error_body = (await response.content.read(200)).decode('utf-8', errors='replace')
+            
+            if status_code == 200:
                 # Check if it's SVG content
-                is_svg = 'image/svg+xml' in content_type or svg_content.strip().startswith('<svg')
-                svg_length = len(svg_content)
+                is_svg = 'image/svg+xml' in content_type or head.strip().startswith(b'<svg')
                 
-                details = f"Content-Type: {content_type}, Length: {svg_length}, Is SVG: {is_svg}"
+                details = f"Content-Type: {content_type}, Length: {length_text}, Is SVG: {is_svg}"
                 
                 if is_svg and svg_length > 100:
                     # Check for astrological elements in SVG
-                    has_circle = '<circle' in svg_content
-                    has_path = '<path' in svg_content
-                    has_text = '<text' in svg_content
+                    has_circle = 'circle' in found
+                    has_path = 'path' in found
+                    has_text = 'text' in found
                     
                     details += f", Elements: circle={has_circle}, path={has_path}, text={has_text}"
                     
@@ -224,54 +352,46 @@ class ChartMapDebugTester:
                     self.log_test("SVG Retrieval Endpoint", False, f"Invalid SVG content: {details}")
                     return False
             else:
-                error_details = f"Status: {response.status_code}, Response: {response.text[:200]}"
+                error_details = f"Status: {status_code}, Response: {error_body}"
                 self.log_test("SVG Retrieval Endpoint", False, error_details)
                 return False
                 
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             self.log_test("SVG Retrieval Endpoint", False, f"Request failed: {str(e)}")
             return False
 
-    def test_kerykeion_svg_file_generation(self):
+    async def test_kerykeion_svg_file_generation(self):
         """Test if KerykeionChartSVG is properly generating files"""
-        # This test checks if the SVG generation process creates files
-        # We'll create a new chart and check the generation process
+        # This test checks if the SVG generation process creates files. Chart creation is
+        # the most expensive call in the suite, so it reuses the chart rendered by
+        # test_chart_generation_with_svg; the DAG runs it after the other map tests on that chart
         
-        if not self.birth_data_id:
-            self.log_test("KerykeionChartSVG File Generation", False, "No birth data available")
+        if not self.chart_id:
+            self.log_test("KerykeionChartSVG File Generation", False, "No chart ID available")
             return False
         
-        # Generate a new chart to test file creation
-        success, response = self.make_request('POST', f'astrology/chart?birth_data_id={self.birth_data_id}', None, 200)
+        chart_id = self.chart_id
+        has_initial_svg = self.chart_has_svg
         
-        if success and 'id' in response:
-            new_chart_id = response['id']
-            
-            # Check if chart was created with SVG content
-            has_initial_svg = 'chart_svg' in response and response['chart_svg'] is not None
+        # Now test the map generation endpoint
+        success2, response2 = await self.make_request('POST', f'charts/{chart_id}/generate-map', None, 200)
+        
+        if success2:
+            has_regenerated_svg = response2.get('has_svg', False)
             
-            # Now test the map generation endpoint
-            success2, response2 = self.make_request('POST', f'charts/{new_chart_id}/generate-map', None, 200)
+            details = f"Chart ID: {chart_id}, Initial SVG: {has_initial_svg}, Regenerated SVG: {has_regenerated_svg}"
             
-            if success2:
-                has_regenerated_svg = response2.get('has_svg', False)
-                
-                details = f"Initial SVG: {has_initial_svg}, Regenerated SVG: {has_regenerated_svg}"
-                
-                if has_initial_svg or has_regenerated_svg:
-                    self.log_test("KerykeionChartSVG File Generation", True, details)
-                    return True
-                else:
-                    self.log_test("KerykeionChartSVG File Generation", False, f"No SVG generated: {details}")
-                    return False
+            if has_initial_svg or has_regenerated_svg:
+                self.log_test("KerykeionChartSVG File Generation", True, details)
+                return True
             else:
-                self.log_test("KerykeionChartSVG File Generation", False, "Map generation failed", response2)
+                self.log_test("KerykeionChartSVG File Generation", False, f"No SVG generated: {details}")
                 return False
         else:
-            self.log_test("KerykeionChartSVG File Generation", False, "Failed to create test chart", response)
+            self.log_test("KerykeionChartSVG File Generation", False, "Map generation failed", response2)
             return False
 
-    def test_svg_file_path_issues(self):
+    async def test_svg_file_path_issues(self):
         """Test for SVG file path and permission issues"""
         # This test will check if there are any file system issues
         
@@ -280,15 +400,14 @@ class ChartMapDebugTester:
             return False
         
         # Try to regenerate the map and check for errors
-        success, response = self.make_request('POST', f'charts/{self.chart_id}/generate-map', None, 200)
+        success, response = await self.make_request('POST', f'charts/{self.chart_id}/generate-map', None, 200)
         
         if success:
             has_svg = response.get('has_svg', False)
             message = response.get('message', '')
             
             # Check if the response indicates file system issues
-            file_error_indicators = ['permission', 'path', 'file not found', 'directory']
-            has_file_error = any(indicator in message.lower() for indicator in file_error_indicators)
+            has_file_error = bool(_FILE_ERR_RE.search(message))
             
             details = f"Message: {message}, Has SVG: {has_svg}, File Error Detected: {has_file_error}"
             
@@ -303,22 +422,31 @@ class ChartMapDebugTester:
             self.log_test("SVG File Path Issues", False, f"Map generation failed: {error_msg}")
             return False
 
-    def test_chart_data_integrity(self):
+    async def _get_charts(self, max_age: float = 5.0) -> tuple:
+        """Return the user's charts keyed by id, refetching when the cache is stale"""
+        if self._charts_by_id is not None and time.monotonic() - self._charts_fetched_at < max_age:
+            return True, self._charts_by_id
+        
+        success, response = await self.make_request('GET', f'astrology/charts/{self.user_id}', None, 200)
+        if not (success and isinstance(response, list)):
+            return False, response
+        
+        self._charts_by_id = {c['id']: c for c in response}
+        self._charts_fetched_at = time.monotonic()
+        return True, self._charts_by_id
+
+    async def test_chart_data_integrity(self):
         """Test if chart data is properly structured for map generation"""
         if not self.chart_id:
             self.log_test("Chart Data Integrity", False, "No chart ID available")
             return False
         
         # Get the chart data
-        success, response = self.make_request('GET', f'astrology/charts/{self.user_id}', None, 200)
+        success, response = await self._get_charts()
         
-        if success and isinstance(response, list) and len(response) > 0:
+        if success and len(response) > 0:
             # Find our chart
-            chart = None
-            for c in response:
-                if c['id'] == self.chart_id:
-                    chart = c
-                    break
+            chart = response.get(self.chart_id)
             
             if chart:
                 # Check chart data structure
@@ -346,77 +474,87 @@ class ChartMapDebugTester:
             self.log_test("Chart Data Integrity", False, "Failed to retrieve charts", response)
             return False
 
-    def test_error_investigation(self):
+    async def _run_probe(self, name: str, method: str, endpoint: str, authenticated: bool) -> tuple:
+        """Run a single error probe and return (name, success, response)"""
+        success, response = await self.make_request(method, endpoint, None, 200, authenticated=authenticated)
+        return name, success, response
+
+    async def test_error_investigation(self):
         """Investigate specific errors in the chart generation process"""
-        print("\n🔍 DETAILED ERROR INVESTIGATION:")
-        
-        # Test with invalid chart ID
-        success, response = self.make_request('POST', 'charts/invalid-id/generate-map', None, 200)
-        if not success:
-            error_msg = str(response)
-            print(f"    Invalid Chart ID Error: {error_msg}")
-        
-        # Test SVG endpoint with invalid ID
-        success, response = self.make_request('GET', 'charts/invalid-id/svg', None, 200)
-        if not success:
-            error_msg = str(response)
-            print(f"    Invalid SVG Request Error: {error_msg}")
-        
-        # Test with missing authentication
-        original_token = self.token
-        self.token = None
-        success, response = self.make_request('POST', f'charts/{self.chart_id}/generate-map', None, 200)
-        self.token = original_token
-        
-        if not success:
-            error_msg = str(response)
-            print(f"    Authentication Error: {error_msg}")
+        self._out.write("\n🔍 DETAILED ERROR INVESTIGATION:\n")
+        
+        # The probes share no state (the unauthenticated one opts out of the token
+        # instead of clearing self.token), so they all run concurrently
+        probes = (
+            ("Invalid Chart ID Error", 'POST', 'charts/invalid-id/generate-map', True),
+            ("Invalid SVG Request Error", 'GET', 'charts/invalid-id/svg', True),
+            ("Authentication Error", 'POST', f'charts/{self.chart_id}/generate-map', False),
+        )
+        results = await asyncio.gather(*(self._run_probe(*probe) for probe in probes))
+        
+        for name, success, response in results:
+            if not success:
+                error_msg = str(response)
+                self._out.write(f"    {name}: {error_msg}\n")
         
         self.log_test("Error Investigation", True, "Completed error investigation - check console output above")
         return True
 
-    def run_chart_map_debug_tests(self):
+    @staticmethod
+    async def _run_dag(nodes: List[Node]) -> Dict[str, Any]:
+        """Run test nodes concurrently, each after its dependencies complete.
+
+        ``nodes`` must be in topological order (dependencies listed before dependents).
+        """
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_node(node: Node):
+            await asyncio.gather(*(tasks[dep] for dep in node.deps))
+            return await node.coro_factory()
+
+        for node in nodes:
+            tasks[node.name] = asyncio.create_task(run_node(node))
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks, results))
+
+    async def run_chart_map_debug_tests(self):
         """Run all chart map debugging tests"""
         print("🗺️  Starting Chart Map Generation Debug Tests...")
         print("=" * 60)
         
-        # Setup
-        print("\n🔧 Setup:")
-        if not self.setup_authentication():
-            print("❌ Authentication setup failed - stopping tests")
-            return False
-        
-        if not self.create_birth_data():
-            print("❌ Birth data creation failed - stopping tests")
-            return False
-        
-        # Core chart generation tests
-        print("\n⭐ Chart Generation Tests:")
-        self.test_chart_generation_with_svg()
-        
-        # Map generation endpoint tests
-        print("\n🗺️  Map Generation Endpoint Tests:")
-        self.test_chart_map_generation_endpoint()
-        
-        # SVG retrieval tests
-        print("\n🖼️  SVG Retrieval Tests:")
-        self.test_svg_retrieval_endpoint()
-        
-        # KerykeionChartSVG integration tests
-        print("\n🔮 KerykeionChartSVG Integration Tests:")
-        self.test_kerykeion_svg_file_generation()
-        
-        # File system tests
-        print("\n📁 File System Tests:")
-        self.test_svg_file_path_issues()
-        
-        # Data integrity tests
-        print("\n📊 Data Integrity Tests:")
-        self.test_chart_data_integrity()
-        
-        # Error investigation
-        print("\n🚨 Error Investigation:")
-        self.test_error_investigation()
+        # One session (and connection pool) is shared by every request in the run
+        connector = aiohttp.TCPConnector(limit=50, limit_per_host=16, ttl_dns_cache=300, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'Content-Type': 'application/json'}) as self.session:
+            # Setup
+            print("\n🔧 Setup:")
+            authenticated = await self.setup_authentication()
+            self._flush_output()
+            if not authenticated:
+                print("❌ Authentication setup failed - stopping tests")
+                return False
+            
+            birth_data_created = await self.create_birth_data()
+            self._flush_output()
+            if not birth_data_created:
+                print("❌ Birth data creation failed - stopping tests")
+                return False
+            
+            # Each test starts as soon as the tests it depends on have finished
+            print("\n⭐ Chart Map Tests:")
+            await self._run_dag([
+                Node("chart_generation", (), self.test_chart_generation_with_svg),
+                Node("map_generation", ("chart_generation",), self.test_chart_map_generation_endpoint),
+                Node("svg_retrieval", ("map_generation",), self.test_svg_retrieval_endpoint),
+                # Regenerates self.chart_id's map, so it waits until the SVG has been read back
+                Node("file_path", ("svg_retrieval",), self.test_svg_file_path_issues),
+                Node("data_integrity", ("chart_generation",), self.test_chart_data_integrity),
+                # Regenerates self.chart_id's map too, so it runs after file_path's regeneration
+                Node("kerykeion", ("file_path",), self.test_kerykeion_svg_file_generation),
+                Node("error_investigation", ("chart_generation",), self.test_error_investigation),
+            ])
+            self._flush_output()
         
         # Summary
         print("\n" + "=" * 60)
@@ -437,6 +575,15 @@ class ChartMapDebugTester:
         
         return len(failed_tests) == 0
 
+    def _timestamped_results(self) -> list:
+        """Copy the test results, converting monotonic offsets to ISO timestamps"""
+        test_details = []
+        for result in self.test_results:
+            result = dict(result)
+            result["timestamp"] = datetime.fromtimestamp(self._t0_wall + result.pop("t_mono")).isoformat()
+            test_details.append(result)
+        return test_details
+
     def save_debug_results(self, filename: str = "/app/chart_map_debug_results.json"):
         """Save debug test results to file"""
         results = {
@@ -447,19 +594,19 @@ class ChartMapDebugTester:
             "success_rate": (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0,
             "chart_id": self.chart_id,
             "birth_data_id": self.birth_data_id,
-            "test_details": self.test_results
+            "test_details": self._timestamped_results()
         }
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(results, f, indent=2)
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
             print(f"📄 Debug results saved to: {filename}")
         except Exception as e:
             print(f"❌ Failed to save results: {str(e)}")
 
 def main():
     tester = ChartMapDebugTester()
-    success = tester.run_chart_map_debug_tests()
+    success = asyncio.run(tester.run_chart_map_debug_tests())
     tester.save_debug_results()
     
     return 0 if success else 1
@@ -1,27 +1,98 @@
 #!/usr/bin/env python3
 
-import requests
+import aiohttp
+import asyncio
 import sys
 import json
+import orjson
+import os
+import time
+import base64
+import argparse
+import hashlib
+import shelve
+import dbm
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, BinaryIO
+
+# Admin tokens from earlier runs, keyed by email, so reruns can skip the login call
+TOKEN_CACHE_PATH = '/tmp/celestia_admin_token.json'
+
+# Recorded (status, response) pairs for --record / --replay runs
+REPLAY_DB_PATH = '/tmp/celestia_replay.db'
+
+# Session times in request bodies, keyed in the replay db by day kind and clock time
+_SLOT_FIELDS = ("start_at", "end_at")
+
+# GET endpoints whose responses don't change within a run, so each is fetched once
+_CACHEABLE_GETS = frozenset({'services'})
+
+# Transient gateway errors and dropped connections are retried with exponential backoff
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = frozenset({502, 503, 504})
+# Only these are retried on a gateway error or timeout, since the server may already have applied a POST
+RETRY_METHODS = frozenset({'GET', 'HEAD'})
+
+# Service catalog the backend must offer, and the prices that are pinned
+_EXPECTED_SERVICES = frozenset({'general-purpose-reading', 'astrological-tarot-session', 'birth-chart-reading', 'follow-up'})
+_EXPECTED_PRICES = {'general-purpose-reading': 65.0, 'astrological-tarot-session': 85.0}
+
+_ONE_HOUR = timedelta(hours=1)
+_THREE_HOURS = timedelta(hours=3)
+_FORTY_FIVE_MIN = timedelta(minutes=45)
+
+def _parse_iso(s: str) -> datetime:
+    """Parse an ISO timestamp, accepting a trailing Z for UTC"""
+    return datetime.fromisoformat(s[:-1] + '+00:00' if s.endswith('Z') else s)
+
+def _slot_key(iso: str) -> str:
+    """Date-independent form of a session time for replay keys, e.g. 'weekday 17:30'"""
+    dt = _parse_iso(iso)
+    return f"{'weekend' if dt.weekday() >= 5 else 'weekday'} {dt:%H:%M}"
+
+def _jwt_exp(token: str) -> float:
+    """Return the exp claim of a JWT, or 0 if it cannot be read"""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims.get('exp', 0))
+    except (IndexError, ValueError, TypeError):
+        return 0
 
 class ComprehensiveBackendTester:
-    def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com"):
+    def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com", use_token_cache: bool = True,
+                 results_path: str = "/app/comprehensive_test_results.jsonl", mode: Optional[str] = None):
         self.base_url = base_url
+        # "record" stores every response in the replay db, "replay" serves stored responses
+        # and never goes to the network, so a request that was not recorded fails
+        self.mode = mode
+        self._replay = shelve.open(REPLAY_DB_PATH, flag='r' if mode == "replay" else 'c') if mode else None
+        self.use_token_cache = use_token_cache
         self.api_url = f"{base_url}/api"
         self.client_token = None
         self.admin_token = None
+        # Authorization headers built once per token (Content-Type is a session default)
+        self._client_hdrs: Optional[Dict[str, str]] = None
+        self._admin_hdrs: Optional[Dict[str, str]] = None
         self.tests_run = 0
         self.tests_passed = 0
-        self.test_results = []
+        self.failures = []  # (test_name, details) of failed tests, for the findings summary
+        # Each result is written as one JSON line as soon as it is logged, to the file
+        # main opens at results_path for the duration of the run
+        self.results_path = results_path
+        self.results_fp: Optional[BinaryIO] = None
+        # One pooled keep-alive session for every call in the run, opened by run_comprehensive_tests
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._get_cache: Dict[tuple, tuple] = {}  # (endpoint, token) -> (status, response_data)
+
+    def close_replay(self):
+        """Close the replay db"""
+        if self._replay is not None:
+            self._replay.close()
 
     def log_test(self, name: str, success: bool, details: str = "", response_data: Any = None):
         """Log test result"""
-        self.tests_run += 1
-        if success:
-            self.tests_passed += 1
-        
         result = {
             "test_name": name,
             "success": success,
@@ -29,51 +100,130 @@ class ComprehensiveBackendTester:
             "response_data": response_data,
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(result)
         
         status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} - {name}")
+        lines = [f"{status} - {name}"]
         if details:
-            print(f"    Details: {details}")
+            lines.append(f"    Details: {details}")
         if not success and response_data:
-            print(f"    Response: {response_data}")
+            lines.append(f"    Response: {response_data}")
+        
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        else:
+            self.failures.append((name, details))
+        if self.results_fp is not None:
+            self.results_fp.write(orjson.dumps(result, default=str) + b'\n')
+        print("\n".join(lines))
+
+    def _replay_key(self, method: str, endpoint: str, data: Optional[Dict], auth_token: Optional[str]) -> str:
+        """Key a request for the replay db"""
+        # Registration emails and issued tokens change every run, so the key uses the
+        # body without its email and which user is calling rather than the token itself;
+        # session times are keyed by day kind and clock time so the db still matches on later dates
+        body = {k: _slot_key(v) if k in _SLOT_FIELDS else v for k, v in data.items() if k != "email"} if data else None
+        caller = "admin" if auth_token and auth_token == self.admin_token else "client" if auth_token else ""
+        raw = f"{method}|{endpoint}|{json.dumps(body, sort_keys=True)}|{caller}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    async def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200, token: str = None) -> tuple:
+        """Make HTTP request on the shared session and return success status and response"""
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return False, {"error": f"Unsupported method: {method}"}
 
-    def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200, token: str = None) -> tuple:
-        """Make HTTP request and return success status and response"""
         url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
         
         auth_token = token or self.client_token
-        if auth_token:
-            headers['Authorization'] = f'Bearer {auth_token}'
+        if auth_token == self.admin_token:
+            headers = self._admin_hdrs
+        elif auth_token == self.client_token:
+            headers = self._client_hdrs
+        else:
+            headers = {'Authorization': f'Bearer {auth_token}'}
 
-        try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
-            else:
-                return False, {"error": f"Unsupported method: {method}"}
+        cache_key = (endpoint, auth_token) if method == 'GET' and endpoint in _CACHEABLE_GETS else None
+        if cache_key in self._get_cache:
+            status, response_data = self._get_cache[cache_key]
+            return status == expected_status, response_data
+
+        replay_key = self._replay_key(method, endpoint, data, auth_token) if self.mode else None
+        if self.mode == "replay":
+            if replay_key not in self._replay:
+                return False, {"error": f"No recorded response for {method} {endpoint} - rerun with --record"}
+            status, response_data = self._replay[replay_key]
+            return status == expected_status, response_data
+
+        # Retry failed connects for any method (nothing reached the server), but gateway errors
+        # and timeouts only for reads, so a retried POST cannot hit a 409 or leave a duplicate row
+        idempotent = method in RETRY_METHODS
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            retries_left = attempt < MAX_RETRIES
 
-            success = response.status_code == expected_status
-            
             try:
-                response_data = response.json()
-            except:
-                response_data = {"status_code": response.status_code, "text": response.text}
+                async with self.session.request(method, url, json=data, headers=headers) as response:
+                    status = response.status
+                    if status in RETRY_STATUSES and idempotent and retries_left:
+                        continue
+                    body = await response.read()
+                    
+                    try:
+                        response_data = orjson.loads(body)
+                    except ValueError:
+                        response_data = {"status_code": status, "text": body.decode('utf-8', errors='replace')}
+
+                if cache_key:
+                    self._get_cache[cache_key] = (status, response_data)
+                if replay_key:
+                    self._replay[replay_key] = (status, response_data)
+                return status == expected_status, response_data
+
+            except aiohttp.ClientConnectorError as e:
+                if not retries_left:
+                    return False, {"error": str(e)}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not (idempotent and retries_left):
+                    return False, {"error": str(e)}
 
-            return success, response_data
+    def _load_cached_admin(self, email: str) -> Optional[Dict[str, Any]]:
+        """Return the cached admin login for email if its token is still valid for a minute"""
+        if not self.use_token_cache:
+            return None
+        try:
+            with open(TOKEN_CACHE_PATH) as f:
+                entry = json.load(f).get(email)
+        except (OSError, ValueError):
+            return None
+        if entry and entry.get('exp', 0) > time.time() + 60:
+            return entry
+        return None
 
-        except requests.exceptions.RequestException as e:
-            return False, {"error": str(e)}
+    def _store_cached_admin(self, email: str, token: str, user_id: str):
+        """Save the admin login for later runs, replacing the cache file atomically"""
+        try:
+            with open(TOKEN_CACHE_PATH) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[email] = {"token": token, "exp": _jwt_exp(token), "user_id": user_id}
+        tmp_path = f"{TOKEN_CACHE_PATH}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not cache admin token: {e}")
 
-    def setup_users(self):
-        """Setup test users"""
-        # Register client
+    async def setup_users(self):
+        """Setup test users; admin-only tests skip themselves if the admin login fails"""
+        # Register the client and log the admin in concurrently
+        client_ok, _ = await asyncio.gather(self._setup_client(), self._setup_admin())
+        return client_ok
+
+    async def _setup_client(self) -> bool:
+        """Register a fresh client user"""
         client_email = f"comprehensive_client_{datetime.now().strftime('%H%M%S')}@celestia.com"
         client_data = {
             "name": "Comprehensive Test Client",
@@ -82,53 +232,61 @@ class ComprehensiveBackendTester:
             "role": "client"
         }
         
-        success, response = self.make_request('POST', 'auth/register', client_data, 200)
+        success, response = await self.make_request('POST', 'auth/register', client_data, 200)
         if success and 'access_token' in response:
             self.client_token = response['access_token']
+            self._client_hdrs = {'Authorization': f'Bearer {self.client_token}'}
             self.client_user_id = response['user']['id']
             self.log_test("Client Setup", True, f"Client registered: {client_email}")
+            return True
         else:
             self.log_test("Client Setup", False, "Failed to register client", response)
             return False
 
-        # Login admin
+    async def _setup_admin(self) -> bool:
+        """Log the admin in, reusing a cached token when one is still valid"""
         admin_login_data = {
             "email": "lago.mistico11@gmail.com",
             "password": "CelestiaAdmin2024!"
         }
         
-        success, response = self.make_request('POST', 'auth/login', admin_login_data, 200)
+        cached = self._load_cached_admin(admin_login_data['email'])
+        if cached:
+            self.admin_token = cached['token']
+            self._admin_hdrs = {'Authorization': f'Bearer {self.admin_token}'}
+            self.admin_user_id = cached['user_id']
+            self.log_test("Admin Setup", True, "Admin token reused from cache")
+            return True
+        
+        success, response = await self.make_request('POST', 'auth/login', admin_login_data, 200)
         if success and 'access_token' in response:
             self.admin_token = response['access_token']
+            self._admin_hdrs = {'Authorization': f'Bearer {self.admin_token}'}
             self.admin_user_id = response['user']['id']
+            self._store_cached_admin(admin_login_data['email'], self.admin_token, self.admin_user_id)
             self.log_test("Admin Setup", True, "Admin logged in")
+            return True
         else:
+            self.admin_token = None
             self.log_test("Admin Setup", False, "Failed to login admin", response)
+            print("⚠️ Continuing without admin - admin feature tests will fail without calling the API")
             return False
-        
-        return True
 
-    def test_services_endpoint(self):
+    async def test_services_endpoint(self):
         """Test services endpoint returns correct data"""
-        success, response = self.make_request('GET', 'services', None, 200)
+        success, response = await self.make_request('GET', 'services', None, 200)
         
         if success and 'services' in response:
             services = response['services']
-            expected_services = ['general-purpose-reading', 'astrological-tarot-session', 'birth-chart-reading', 'follow-up']
             
-            service_ids = [service['id'] for service in services]
-            missing_services = [svc for svc in expected_services if svc not in service_ids]
+            service_ids = {service['id'] for service in services}
+            missing_services = sorted(_EXPECTED_SERVICES - service_ids)
             
             if not missing_services:
                 # Check pricing
-                pricing_correct = True
-                pricing_details = []
-                for service in services:
-                    if service['id'] == 'general-purpose-reading' and service['price'] != 65.0:
-                        pricing_correct = False
-                    elif service['id'] == 'astrological-tarot-session' and service['price'] != 85.0:
-                        pricing_correct = False
-                    pricing_details.append(f"{service['id']}: ${service['price']}")
+                pricing_correct = not any(service['price'] != _EXPECTED_PRICES[service['id']]
+                                          for service in services if service['id'] in _EXPECTED_PRICES)
+                pricing_details = [f"{service['id']}: ${service['price']}" for service in services]
                 
                 if pricing_correct:
                     self.log_test("Services Endpoint", True, f"All services available with correct pricing: {', '.join(pricing_details)}")
@@ -139,7 +297,7 @@ class ComprehensiveBackendTester:
         else:
             self.log_test("Services Endpoint", False, "Failed to get services", response)
 
-    def test_business_hours_validation(self):
+    async def test_business_hours_validation(self):
         """Test business hours validation"""
         # Test session ending after 6 PM (should fail)
         # Use next Monday to avoid weekend issues
@@ -150,7 +308,7 @@ class ComprehensiveBackendTester:
         next_monday = today + timedelta(days=days_until_monday)
         
         test_time = next_monday.replace(hour=17, minute=30, second=0, microsecond=0)
-        end_time = test_time + timedelta(hours=1)  # Ends at 6:30 PM
+        end_time = test_time + _ONE_HOUR  # Ends at 6:30 PM
         
         session_data = {
             "service_type": "general-purpose-reading",
@@ -159,7 +317,7 @@ class ComprehensiveBackendTester:
             "client_message": "Testing business hours validation"
         }
         
-        success, response = self.make_request('POST', 'sessions', session_data, 200)
+        success, response = await self.make_request('POST', 'sessions', session_data, 200)
         
         if not success and 'must conclude by 6:00 PM' in str(response):
             self.log_test("Business Hours Validation (After 6 PM)", True, "Correctly rejected session ending after 6 PM")
@@ -169,7 +327,7 @@ class ComprehensiveBackendTester:
         # Test session ending exactly at 6 PM (should succeed)
         # Use a different time to avoid calendar conflicts
         test_time_6pm = next_monday.replace(hour=15, minute=0, second=0, microsecond=0)
-        end_time_6pm = test_time_6pm + timedelta(hours=3)  # 3:00 PM to 6:00 PM
+        end_time_6pm = test_time_6pm + _THREE_HOURS  # 3:00 PM to 6:00 PM
         
         session_data_6pm = {
             "service_type": "birth-chart-reading",  # 90-minute service
@@ -178,7 +336,7 @@ class ComprehensiveBackendTester:
             "client_message": "Testing 6 PM boundary"
         }
         
-        success, response = self.make_request('POST', 'sessions', session_data_6pm, 200)
+        success, response = await self.make_request('POST', 'sessions', session_data_6pm, 200)
         
         if success and 'id' in response:
             self.session_id = response['id']
@@ -186,7 +344,7 @@ class ComprehensiveBackendTester:
         else:
             self.log_test("Business Hours Validation (At 6 PM)", False, "Failed to accept session ending at 6 PM", response)
 
-    def test_session_duration_calculation(self):
+    async def test_session_duration_calculation(self):
         """Test session duration calculations for different services"""
         # Test 45-minute service - use next Tuesday to ensure it's a weekday
         today = datetime.now()
@@ -196,7 +354,7 @@ class ComprehensiveBackendTester:
         next_tuesday = today + timedelta(days=days_until_tuesday)
         
         start_time = next_tuesday.replace(hour=11, minute=0, second=0, microsecond=0)
-        end_time = start_time + timedelta(minutes=45)
+        end_time = start_time + _FORTY_FIVE_MIN
         
         session_data = {
             "service_type": "general-purpose-reading",
@@ -205,11 +363,11 @@ class ComprehensiveBackendTester:
             "client_message": "Testing 45-minute duration"
         }
         
-        success, response = self.make_request('POST', 'sessions', session_data, 200)
+        success, response = await self.make_request('POST', 'sessions', session_data, 200)
         
         if success:
-            stored_start = datetime.fromisoformat(response['start_at'].replace('Z', '+00:00'))
-            stored_end = datetime.fromisoformat(response['end_at'].replace('Z', '+00:00'))
+            stored_start = _parse_iso(response['start_at'])
+            stored_end = _parse_iso(response['end_at'])
             duration_minutes = (stored_end - stored_start).total_seconds() / 60
             
             if duration_minutes == 45:
@@ -219,13 +377,13 @@ class ComprehensiveBackendTester:
         else:
             self.log_test("Duration Calculation (45 min)", False, "Failed to create 45-minute session", response)
 
-    def test_admin_sessions_list(self):
+    async def test_admin_sessions_list(self):
         """Test admin sessions list endpoint"""
         if not self.admin_token:
             self.log_test("Admin Sessions List", False, "No admin token available")
             return
         
-        success, response = self.make_request('GET', 'admin/sessions', None, 200, self.admin_token)
+        success, response = await self.make_request('GET', 'admin/sessions', None, 200, self.admin_token)
         
         if success and isinstance(response, list):
             # Check if sessions have required fields and no ObjectId issues
@@ -243,13 +401,13 @@ class ComprehensiveBackendTester:
         else:
             self.log_test("Admin Sessions List", False, "Failed to retrieve admin sessions", response)
 
-    def test_reader_dashboard_access(self):
+    async def test_reader_dashboard_access(self):
         """Test reader dashboard access for admin users"""
         if not self.admin_token:
             self.log_test("Reader Dashboard Access", False, "No admin token available")
             return
         
-        success, response = self.make_request('GET', 'reader/dashboard', None, 200, self.admin_token)
+        success, response = await self.make_request('GET', 'reader/dashboard', None, 200, self.admin_token)
         
         if success and 'stats' in response and 'sessions' in response:
             stats = response['stats']
@@ -267,22 +425,22 @@ class ComprehensiveBackendTester:
         else:
             self.log_test("Reader Dashboard Access", False, "Failed to access reader dashboard", response)
 
-    def test_time_storage_consistency(self):
+    async def test_time_storage_consistency(self):
         """Test time storage and retrieval consistency"""
         if not hasattr(self, 'session_id'):
             self.log_test("Time Storage Consistency", False, "No session available for testing")
             return
         
         # Get the session we created earlier
-        success, response = self.make_request('GET', f'sessions/{self.session_id}', None, 200)
+        success, response = await self.make_request('GET', f'sessions/{self.session_id}', None, 200)
         
         if success:
             start_time = response.get('start_at')
             end_time = response.get('end_at')
             
             if start_time and end_time:
-                start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+                start_dt = _parse_iso(start_time)
+                end_dt = _parse_iso(end_time)
                 
                 # Check if times are consistent (end time should be after start time)
                 if end_dt > start_dt:
@@ -295,27 +453,41 @@ class ComprehensiveBackendTester:
         else:
             self.log_test("Time Storage Consistency", False, "Failed to retrieve session for time test", response)
 
-    def run_comprehensive_tests(self):
+    async def run_comprehensive_tests(self):
         """Run comprehensive backend tests"""
         print("🌟 Starting Comprehensive Backend Tests...")
         print("=" * 60)
         
+        # Every call goes to the one preview host: keep its connections and DNS answer for the
+        # whole run, and fail a dead connect fast instead of eating the whole request timeout
+        connector = aiohttp.TCPConnector(limit=20, limit_per_host=20, keepalive_timeout=60, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30, connect=5),
+                                         headers={'Content-Type': 'application/json'}) as self.session:
+            try:
+                return await self._run_comprehensive_tests()
+            finally:
+                self._get_cache.clear()
+
+    async def _run_comprehensive_tests(self):
+        """Run the comprehensive tests once the shared session is open"""
         # Setup
-        if not self.setup_users():
+        if not await self.setup_users():
             print("❌ User setup failed - stopping tests")
             return False
         
-        print("\n🔧 Core API Tests:")
-        self.test_services_endpoint()
+        print("\n🔧 Core API, Business Logic and Admin Features Tests:")
+        # These tests are independent network calls, so they run concurrently;
+        # the time storage test reads the session the business hours test creates
+        await asyncio.gather(
+            self.test_services_endpoint(),
+            self.test_business_hours_validation(),
+            self.test_session_duration_calculation(),
+            self.test_admin_sessions_list(),
+            self.test_reader_dashboard_access(),
+        )
         
-        print("\n⏰ Business Logic Tests:")
-        self.test_business_hours_validation()
-        self.test_session_duration_calculation()
-        self.test_time_storage_consistency()
-        
-        print("\n👑 Admin Features Tests:")
-        self.test_admin_sessions_list()
-        self.test_reader_dashboard_access()
+        print("\n⏰ Time Storage Tests:")
+        await self.test_time_storage_consistency()
         
         # Summary
         print("\n" + "=" * 60)
@@ -325,33 +497,53 @@ class ComprehensiveBackendTester:
         
         # Specific findings
         print("\n🔍 FINDINGS:")
-        failed_tests = [result for result in self.test_results if not result['success']]
-        if failed_tests:
+        if self.failures:
             print("❌ FAILED TESTS:")
-            for test in failed_tests:
-                print(f"   - {test['test_name']}: {test['details']}")
+            for test_name, details in self.failures:
+                print(f"   - {test_name}: {details}")
         else:
             print("✅ All comprehensive tests passed!")
         
         return self.tests_passed == self.tests_run
 
 def main():
-    tester = ComprehensiveBackendTester()
-    success = tester.run_comprehensive_tests()
+    parser = argparse.ArgumentParser(description="Comprehensive backend tests")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Always log the admin in instead of reusing the token cached in {TOKEN_CACHE_PATH}")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", action="store_const", const="record", dest="mode",
+                      help=f"Run against the live API and record every response to {REPLAY_DB_PATH}")
+    mode.add_argument("--replay", action="store_const", const="replay", dest="mode",
+                      help="Serve recorded responses instead of calling the API (also enabled by REPLAY=1)")
+    args = parser.parse_args()
+    if args.mode is None and os.environ.get('REPLAY') == '1':
+        args.mode = "replay"
+    if args.mode == "replay" and dbm.whichdb(REPLAY_DB_PATH) is None:
+        parser.error(f"no replay db at {REPLAY_DB_PATH} - run once with --record first")
+
+    tester = ComprehensiveBackendTester(use_token_cache=not args.no_cache, mode=args.mode)
+    try:
+        with open(tester.results_path, 'wb') as results_fp:
+            tester.results_fp = results_fp
+            success = asyncio.run(tester.run_comprehensive_tests())
+    finally:
+        tester.results_fp = None
+        tester.close_replay()
     
-    # Save results
+    # Save the summary; the per-test details were streamed to the JSONL file
+    summary_path = '/app/comprehensive_test_summary.json'
     results = {
         "timestamp": datetime.now().isoformat(),
         "total_tests": tester.tests_run,
         "passed_tests": tester.tests_passed,
         "success_rate": (tester.tests_passed / tester.tests_run * 100) if tester.tests_run > 0 else 0,
-        "test_details": tester.test_results
+        "test_details_path": tester.results_path
     }
     
-    with open('/app/comprehensive_test_results.json', 'w') as f:
-        json.dump(results, f, indent=2)
+    with open(summary_path, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
     
-    print(f"\n📄 Test results saved to: /app/comprehensive_test_results.json")
+    print(f"\n📄 Test results saved to: {tester.results_path} (summary: {summary_path})")
     
     return 0 if success else 1
 
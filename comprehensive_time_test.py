@@ -1,14 +1,65 @@
 #!/usr/bin/env python3
 
 import requests
+from requests.adapters import HTTPAdapter
 import sys
-import json
+import argparse
+import time
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
 
+# ciso8601 parses ISO timestamps, trailing Z included, in C; the stdlib parser is the fallback
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    def _parse_iso(s: str) -> datetime:
+        """Parse an ISO timestamp, accepting a trailing Z for UTC"""
+        return datetime.fromisoformat(s[:-1] + '+00:00' if s.endswith('Z') else s)
+
+# Service types with their expected durations: (service_type, minutes, description)
+DURATION_CASES = (
+    ("general-purpose-reading", 45, "45-minute General Reading"),
+    ("astrological-tarot-session", 60, "60-minute Astrological Tarot"),
+    ("birth-chart-reading", 90, "90-minute Birth Chart Reading"),
+    ("follow-up", 30, "30-minute Follow-up Session"),
+)
+
+# Bookings around the 6 PM cutoff: (hour, minute, minutes, description, should_succeed)
+HOURS_CASES = (
+    (17, 0, 45, "5:00 PM + 45 min = 5:45 PM", True),   # Should succeed (ends before 6 PM)
+    (17, 15, 45, "5:15 PM + 45 min = 6:00 PM", True),  # Should succeed (ends exactly at 6 PM)
+    (17, 16, 45, "5:16 PM + 45 min = 6:01 PM", False), # Should fail (ends after 6 PM)
+    (17, 30, 60, "5:30 PM + 60 min = 6:30 PM", False), # Should fail (ends after 6 PM)
+)
+
+# Days needed to move a date onto a weekday, indexed by weekday (Mon=0..Sun=6):
+# weekdays stay put, Saturday and Sunday roll on to Monday
+_SKIP_TO_MON = (0, 0, 0, 0, 0, 2, 1)
+
+# Section rules for the console output
+_BAR = "=" * 80
+_SEP = "\n" + _BAR
+
+# Fields of a successful response kept in test_results; failures keep the whole body
+_SUMMARY_KEYS = ('id', 'start_at', 'end_at', 'status')
+
+def _error_detail(response: Any) -> str:
+    """Lower-cased error message of a rejected request, from its detail or error field"""
+    if isinstance(response, dict):
+        return (response.get('detail') or response.get('error') or '').lower()
+    return ''
+
+def _next_weekday(start: datetime, days_ahead: int = 1) -> datetime:
+    """Return the date days_ahead after start, moved on to Monday if it falls on a weekend"""
+    candidate = start + timedelta(days=days_ahead)
+    return candidate + timedelta(days=_SKIP_TO_MON[candidate.weekday()])
+
 class ComprehensiveTimeTester:
-    def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com"):
+    def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com", verbose: bool = False):
         self.base_url = base_url
+        self.verbose = verbose  # print each test's progress, not just pass/fail and issues
         self.api_url = f"{base_url}/api"
         self.token = None
         self.user_id = None
@@ -16,6 +67,24 @@ class ComprehensiveTimeTester:
         self.tests_passed = 0
         self.test_results = []
         self.issues_found = []
+        # Test dates are worked out from one clock reading taken when the tester is created;
+        # results and issues record monotonic offsets from it, converted only when saved
+        self._now = datetime.now()
+        self._epoch_mono = time.monotonic_ns()
+        self._url_cache: Dict[str, str] = {}  # endpoint -> full URL
+        # One pooled keep-alive session, so every call to the API host reuses the TLS connection
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @staticmethod
+    def _summarize(response_data: Any, success: bool) -> Any:
+        """Trim a successful response to its identifying fields for the saved results"""
+        if success and isinstance(response_data, dict):
+            return {k: response_data[k] for k in _SUMMARY_KEYS if k in response_data}
+        return response_data
 
     def log_test(self, name: str, success: bool, details: str = "", response_data: Any = None):
         """Log test result"""
@@ -27,8 +96,8 @@ class ComprehensiveTimeTester:
             "test_name": name,
             "success": success,
             "details": details,
-            "response_data": response_data,
-            "timestamp": datetime.now().isoformat()
+            "response_data": self._summarize(response_data, success),
+            "ts_ns": time.monotonic_ns() - self._epoch_mono
         }
         self.test_results.append(result)
         
@@ -39,44 +108,51 @@ class ComprehensiveTimeTester:
         if not success and response_data:
             print(f"    Response: {response_data}")
 
+    def _log(self, msg: str):
+        """Print a progress line in verbose mode"""
+        if self.verbose:
+            print(msg)
+
     def log_issue(self, issue_type: str, description: str, data: Any = None):
         """Log critical issue found"""
         issue = {
             "type": issue_type,
             "description": description,
             "data": data,
-            "timestamp": datetime.now().isoformat()
+            "ts_ns": time.monotonic_ns() - self._epoch_mono
         }
         self.issues_found.append(issue)
         print(f"🚨 CRITICAL ISSUE - {issue_type}: {description}")
         if data:
             print(f"    Data: {data}")
 
+    def _timestamped(self, records: list) -> list:
+        """Copy logged records, converting monotonic offsets to ISO timestamps"""
+        timestamped = []
+        for record in records:
+            record = dict(record)
+            ts = self._now + timedelta(microseconds=record.pop("ts_ns") // 1000)
+            record["timestamp"] = ts.isoformat()
+            timestamped.append(record)
+        return timestamped
+
     def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200) -> tuple:
         """Make HTTP request and return success status and response"""
-        url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
-        
-        if self.token:
-            headers['Authorization'] = f'Bearer {self.token}'
+        url = self._url_cache.get(endpoint)
+        if url is None:
+            url = self._url_cache[endpoint] = f"{self.api_url}/{endpoint}"
+
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return False, {"error": f"Unsupported method: {method}"}
 
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
-            else:
-                return False, {"error": f"Unsupported method: {method}"}
+            response = self.session.request(method, url, json=data if method in ('POST', 'PUT') else None, timeout=30)
 
             success = response.status_code == expected_status
             
             try:
-                response_data = response.json()
-            except:
+                response_data = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
                 response_data = {"status_code": response.status_code, "text": response.text}
 
             return success, response_data
@@ -86,12 +162,7 @@ class ComprehensiveTimeTester:
 
     def get_next_weekday(self, days_ahead=1):
         """Get next weekday (Monday-Friday) for testing"""
-        current = datetime.now()
-        for i in range(days_ahead, days_ahead + 7):
-            test_date = current + timedelta(days=i)
-            if test_date.weekday() < 5:  # Monday=0, Friday=4
-                return test_date
-        return current + timedelta(days=days_ahead)
+        return _next_weekday(self._now, days_ahead)
 
     def setup_test_user(self):
         """Setup test user for testing"""
@@ -107,6 +178,8 @@ class ComprehensiveTimeTester:
         
         if success and 'access_token' in response:
             self.token = response['access_token']
+            # Sent as a session default from here on, rather than built into every request
+            self.session.headers['Authorization'] = f'Bearer {self.token}'
             self.user_id = response['user']['id']
             self.log_test("Test User Setup", True, f"Created test user: {test_email}")
             return True
@@ -116,15 +189,15 @@ class ComprehensiveTimeTester:
 
     def test_specific_10am_3pm_issue(self):
         """Test the specific reported issue: 10 AM sessions showing as 3:00 PM"""
-        print("\n🕐 SPECIFIC ISSUE TEST: 10 AM → 3:00 PM Bug")
+        self._log("\n🕐 SPECIFIC ISSUE TEST: 10 AM → 3:00 PM Bug")
         
         # Get next weekday
         test_date = self.get_next_weekday(1)
         start_time = test_date.replace(hour=10, minute=0, second=0, microsecond=0)
         end_time = start_time + timedelta(minutes=45)  # 45-minute session
         
-        print(f"📅 Creating 45-minute session starting at 10:00 AM on {test_date.strftime('%A, %Y-%m-%d')}")
-        print(f"📅 Expected end time: 10:45 AM")
+        self._log(f"📅 Creating 45-minute session starting at 10:00 AM on {test_date.strftime('%A, %Y-%m-%d')}")
+        self._log(f"📅 Expected end time: 10:45 AM")
         
         session_data = {
             "service_type": "general-purpose-reading",  # 45 minutes, $65
@@ -140,19 +213,19 @@ class ComprehensiveTimeTester:
             stored_start = response.get('start_at')
             stored_end = response.get('end_at')
             
-            print(f"✅ Session created: {session_id}")
-            print(f"📊 Backend returned start_at: {stored_start}")
-            print(f"📊 Backend returned end_at: {stored_end}")
+            self._log(f"✅ Session created: {session_id}")
+            self._log(f"📊 Backend returned start_at: {stored_start}")
+            self._log(f"📊 Backend returned end_at: {stored_end}")
             
             # Parse the times to check for the specific bug
             try:
                 if stored_start:
-                    parsed_start = datetime.fromisoformat(stored_start.replace('Z', '+00:00'))
-                    print(f"🔍 Parsed start time: {parsed_start.strftime('%I:%M %p')} ({parsed_start.hour}:00)")
+                    parsed_start = _parse_iso(stored_start)
+                    self._log(f"🔍 Parsed start time: {parsed_start.strftime('%I:%M %p')} ({parsed_start.hour}:00)")
                     
                 if stored_end:
-                    parsed_end = datetime.fromisoformat(stored_end.replace('Z', '+00:00'))
-                    print(f"🔍 Parsed end time: {parsed_end.strftime('%I:%M %p')} ({parsed_end.hour}:{parsed_end.minute:02d})")
+                    parsed_end = _parse_iso(stored_end)
+                    self._log(f"🔍 Parsed end time: {parsed_end.strftime('%I:%M %p')} ({parsed_end.hour}:{parsed_end.minute:02d})")
                     
                     # Check for the specific bug: 10:45 AM showing as 3:45 PM
                     if parsed_end.hour == 15 and parsed_end.minute == 45:  # 3:45 PM
@@ -182,14 +255,14 @@ class ComprehensiveTimeTester:
 
     def test_double_booking_on_weekday(self):
         """Test double booking prevention on a valid weekday"""
-        print("\n📅 DOUBLE BOOKING TEST: Weekday Business Hours")
+        self._log("\n📅 DOUBLE BOOKING TEST: Weekday Business Hours")
         
         # Get next weekday
         test_date = self.get_next_weekday(2)
         start_time = test_date.replace(hour=14, minute=0, second=0, microsecond=0)  # 2:00 PM
         end_time = start_time + timedelta(hours=1)  # 3:00 PM
         
-        print(f"📅 Testing double booking on {test_date.strftime('%A, %Y-%m-%d')} from 2:00 PM to 3:00 PM")
+        self._log(f"📅 Testing double booking on {test_date.strftime('%A, %Y-%m-%d')} from 2:00 PM to 3:00 PM")
         
         # Create first session
         session_data = {
@@ -203,13 +276,13 @@ class ComprehensiveTimeTester:
         
         if success1 and 'id' in response1:
             first_session_id = response1['id']
-            print(f"✅ First session created: {first_session_id}")
+            self._log(f"✅ First session created: {first_session_id}")
             
             # Complete payment to confirm and block the time slot
             success_payment, payment_response = self.make_request('POST', f'sessions/{first_session_id}/payment/complete', None, 200)
             
             if success_payment:
-                print("✅ First session payment completed - time slot should now be blocked")
+                self._log("✅ First session payment completed - time slot should now be blocked")
                 
                 # Try to create overlapping session
                 overlapping_data = {
@@ -222,7 +295,7 @@ class ComprehensiveTimeTester:
                 success2, response2 = self.make_request('POST', 'sessions', overlapping_data, 200)
                 
                 if not success2:
-                    error_message = str(response2).lower()
+                    error_message = _error_detail(response2)
                     if 'not available' in error_message or 'conflict' in error_message or 'slot' in error_message:
                         self.log_test("Double Booking Prevention", True, 
                                      "Successfully prevented overlapping booking")
@@ -250,35 +323,32 @@ class ComprehensiveTimeTester:
 
     def test_session_duration_calculations(self):
         """Test various session durations to identify calculation issues"""
-        print("\n⏱️  SESSION DURATION CALCULATIONS TEST")
+        self._log("\n⏱️  SESSION DURATION CALCULATIONS TEST")
         
         test_date = self.get_next_weekday(3)
         
-        # Test different service types with their expected durations
-        test_cases = [
-            ("general-purpose-reading", 45, "45-minute General Reading"),
-            ("astrological-tarot-session", 60, "60-minute Astrological Tarot"),
-            ("birth-chart-reading", 90, "90-minute Birth Chart Reading"),
-            ("follow-up", 30, "30-minute Follow-up Session")
-        ]
-        
         calculation_errors = 0
         
-        for service_type, expected_minutes, description in test_cases:
-            start_time = test_date.replace(hour=11, minute=0, second=0, microsecond=0)
+        # Each case gets its own slot, two hours after the previous one from 11:00 AM, so the
+        # bookings are independent and can be made concurrently
+        cases = []
+        for i, (service_type, expected_minutes, description) in enumerate(DURATION_CASES):
+            start_time = test_date.replace(hour=11 + 2 * i, minute=0, second=0, microsecond=0)
             end_time = start_time + timedelta(minutes=expected_minutes)
-            
-            print(f"\n🔍 Testing {description}")
-            print(f"   Expected: {start_time.strftime('%I:%M %p')} → {end_time.strftime('%I:%M %p')} ({expected_minutes} min)")
-            
             session_data = {
                 "service_type": service_type,
                 "start_at": start_time.isoformat(),
                 "end_at": end_time.isoformat(),
                 "client_message": f"Testing {description} duration calculation"
             }
-            
-            success, response = self.make_request('POST', 'sessions', session_data, 200)
+            cases.append((expected_minutes, description, start_time, end_time, session_data))
+        
+        with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+            results = list(executor.map(lambda case: self.make_request('POST', 'sessions', case[4], 200), cases))
+        
+        for (expected_minutes, description, start_time, end_time, _), (success, response) in zip(cases, results):
+            self._log(f"\n🔍 Testing {description}")
+            self._log(f"   Expected: {start_time.strftime('%I:%M %p')} → {end_time.strftime('%I:%M %p')} ({expected_minutes} min)")
             
             if success and 'id' in response:
                 stored_start = response.get('start_at')
@@ -286,19 +356,19 @@ class ComprehensiveTimeTester:
                 
                 try:
                     if stored_start and stored_end:
-                        parsed_start = datetime.fromisoformat(stored_start.replace('Z', '+00:00'))
-                        parsed_end = datetime.fromisoformat(stored_end.replace('Z', '+00:00'))
+                        parsed_start = _parse_iso(stored_start)
+                        parsed_end = _parse_iso(stored_end)
                         
                         actual_duration = (parsed_end - parsed_start).total_seconds() / 60
                         
-                        print(f"   Stored: {parsed_start.strftime('%I:%M %p')} → {parsed_end.strftime('%I:%M %p')} ({actual_duration:.0f} min)")
+                        self._log(f"   Stored: {parsed_start.strftime('%I:%M %p')} → {parsed_end.strftime('%I:%M %p')} ({actual_duration:.0f} min)")
                         
                         if abs(actual_duration - expected_minutes) > 1:  # Allow 1 minute tolerance
                             calculation_errors += 1
                             self.log_issue("DURATION_CALCULATION_ERROR", 
                                          f"{description}: Expected {expected_minutes} min, got {actual_duration:.0f} min")
                         else:
-                            print(f"   ✅ Duration calculation correct")
+                            self._log(f"   ✅ Duration calculation correct")
                             
                 except Exception as e:
                     calculation_errors += 1
@@ -306,10 +376,7 @@ class ComprehensiveTimeTester:
                                  f"Failed to parse duration for {description}: {str(e)}")
             else:
                 calculation_errors += 1
-                print(f"   ❌ Failed to create session for {description}")
-            
-            # Move to next hour for next test
-            test_date = test_date.replace(hour=test_date.hour + 2)
+                self._log(f"   ❌ Failed to create session for {description}")
         
         if calculation_errors == 0:
             self.log_test("Session Duration Calculations", True, 
@@ -322,57 +389,53 @@ class ComprehensiveTimeTester:
 
     def test_business_hours_edge_cases(self):
         """Test edge cases around business hours (6 PM cutoff)"""
-        print("\n🕕 BUSINESS HOURS EDGE CASES TEST")
+        self._log("\n🕕 BUSINESS HOURS EDGE CASES TEST")
         
         test_date = self.get_next_weekday(4)
         
-        # Test cases around 6 PM cutoff
-        test_cases = [
-            (17, 0, 45, "5:00 PM + 45 min = 5:45 PM", True),   # Should succeed (ends before 6 PM)
-            (17, 15, 45, "5:15 PM + 45 min = 6:00 PM", True),  # Should succeed (ends exactly at 6 PM)
-            (17, 16, 45, "5:16 PM + 45 min = 6:01 PM", False), # Should fail (ends after 6 PM)
-            (17, 30, 60, "5:30 PM + 60 min = 6:30 PM", False), # Should fail (ends after 6 PM)
-        ]
-        
         edge_case_errors = 0
         
-        for hour, minute, duration, description, should_succeed in test_cases:
+        # The cases are independent, so they are submitted concurrently and reported in order
+        cases = []
+        for hour, minute, duration, description, should_succeed in HOURS_CASES:
             start_time = test_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
             end_time = start_time + timedelta(minutes=duration)
-            
-            print(f"\n🔍 Testing: {description}")
-            print(f"   Expected result: {'SUCCESS' if should_succeed else 'REJECTION'}")
-            
             session_data = {
                 "service_type": "general-purpose-reading",
                 "start_at": start_time.isoformat(),
                 "end_at": end_time.isoformat(),
                 "client_message": f"Testing business hours: {description}"
             }
-            
-            success, response = self.make_request('POST', 'sessions', session_data, 200)
+            cases.append((description, should_succeed, end_time, session_data))
+        
+        with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+            results = list(executor.map(lambda case: self.make_request('POST', 'sessions', case[3], 200), cases))
+        
+        for (description, should_succeed, end_time, _), (success, response) in zip(cases, results):
+            self._log(f"\n🔍 Testing: {description}")
+            self._log(f"   Expected result: {'SUCCESS' if should_succeed else 'REJECTION'}")
             
             if should_succeed:
                 if success:
-                    print(f"   ✅ Correctly allowed session ending at {end_time.strftime('%I:%M %p')}")
+                    self._log(f"   ✅ Correctly allowed session ending at {end_time.strftime('%I:%M %p')}")
                 else:
                     edge_case_errors += 1
                     self.log_issue("BUSINESS_HOURS_FALSE_REJECTION", 
                                  f"Session incorrectly rejected: {description}")
-                    print(f"   ❌ Incorrectly rejected: {response}")
+                    self._log(f"   ❌ Incorrectly rejected: {response}")
             else:
                 if not success:
-                    error_message = str(response).lower()
-                    if '6' in error_message or 'business' in error_message or 'hour' in error_message:
-                        print(f"   ✅ Correctly rejected session ending at {end_time.strftime('%I:%M %p')}")
+                    error_message = _error_detail(response)
+                    if '6:00' in error_message or 'business' in error_message or 'hour' in error_message:
+                        self._log(f"   ✅ Correctly rejected session ending at {end_time.strftime('%I:%M %p')}")
                     else:
                         edge_case_errors += 1
-                        print(f"   ⚠️  Rejected but wrong reason: {response}")
+                        self._log(f"   ⚠️  Rejected but wrong reason: {response}")
                 else:
                     edge_case_errors += 1
                     self.log_issue("BUSINESS_HOURS_FALSE_ACCEPTANCE", 
                                  f"Session incorrectly allowed: {description}")
-                    print(f"   ❌ Incorrectly allowed session ending at {end_time.strftime('%I:%M %p')}")
+                    self._log(f"   ❌ Incorrectly allowed session ending at {end_time.strftime('%I:%M %p')}")
         
         if edge_case_errors == 0:
             self.log_test("Business Hours Edge Cases", True, 
@@ -386,7 +449,7 @@ class ComprehensiveTimeTester:
     def run_comprehensive_tests(self):
         """Run all comprehensive time-related tests"""
         print("🕐 Starting Comprehensive Time Display and Double Booking Investigation...")
-        print("=" * 80)
+        print(_BAR)
         
         # Setup
         if not self.setup_test_user():
@@ -394,36 +457,39 @@ class ComprehensiveTimeTester:
             return False
         
         # Run specific tests for reported issues
-        print("\n" + "=" * 80)
+        self._log(_SEP)
         self.test_specific_10am_3pm_issue()
         
-        print("\n" + "=" * 80)
+        self._log(_SEP)
         self.test_double_booking_on_weekday()
         
-        print("\n" + "=" * 80)
+        self._log(_SEP)
         self.test_session_duration_calculations()
         
-        print("\n" + "=" * 80)
+        self._log(_SEP)
         self.test_business_hours_edge_cases()
         
-        # Summary
-        print("\n" + "=" * 80)
-        print("🔍 COMPREHENSIVE INVESTIGATION SUMMARY")
-        print("=" * 80)
-        print(f"📊 Tests Run: {self.tests_run}")
-        print(f"✅ Tests Passed: {self.tests_passed}")
-        print(f"❌ Tests Failed: {self.tests_run - self.tests_passed}")
-        print(f"🚨 Critical Issues Found: {len(self.issues_found)}")
+        # Summary, written in one go
+        lines = [
+            _SEP,
+            "🔍 COMPREHENSIVE INVESTIGATION SUMMARY",
+            _BAR,
+            f"📊 Tests Run: {self.tests_run}",
+            f"✅ Tests Passed: {self.tests_passed}",
+            f"❌ Tests Failed: {self.tests_run - self.tests_passed}",
+            f"🚨 Critical Issues Found: {len(self.issues_found)}",
+        ]
         
         if self.issues_found:
-            print("\n🚨 CRITICAL ISSUES IDENTIFIED:")
-            for i, issue in enumerate(self.issues_found, 1):
-                print(f"{i}. {issue['type']}: {issue['description']}")
+            lines.append("\n🚨 CRITICAL ISSUES IDENTIFIED:")
+            lines.extend(f"{i}. {issue['type']}: {issue['description']}"
+                         for i, issue in enumerate(self.issues_found, 1))
         else:
-            print("\n✅ No critical issues found")
+            lines.append("\n✅ No critical issues found")
         
         success_rate = (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0
-        print(f"\n📈 Success Rate: {success_rate:.1f}%")
+        lines.append(f"\n📈 Success Rate: {success_rate:.1f}%")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return len(self.issues_found) == 0
 
@@ -436,17 +502,22 @@ class ComprehensiveTimeTester:
             "passed_tests": self.tests_passed,
             "success_rate": (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0,
             "critical_issues_found": len(self.issues_found),
-            "issues": self.issues_found,
-            "test_details": self.test_results
+            "issues": self._timestamped(self.issues_found),
+            "test_details": self._timestamped(self.test_results)
         }
         
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_NON_STR_KEYS))
         
         print(f"📄 Test results saved to: {filename}")
 
 def main():
-    tester = ComprehensiveTimeTester()
+    parser = argparse.ArgumentParser(description="Comprehensive time display and double booking investigation")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print each test's progress, not just pass/fail results and issues")
+    args = parser.parse_args()
+
+    tester = ComprehensiveTimeTester(verbose=args.verbose)
     success = tester.run_comprehensive_tests()
     tester.save_results()
     
@@ -7,6 +7,8 @@ from datetime import datetime
 def test_svg_debug():
     base_url = "https://astro-reader-1.preview.emergentagent.com"
     api_url = f"{base_url}/api"
+    # Reuse one keep-alive connection for every call instead of a new TLS handshake per request
+    s = requests.Session()
     
     # Register user
     test_email = f"svg_debug_{datetime.now().strftime('%H%M%S')}@celestia.com"
@@ -17,7 +19,7 @@ def test_svg_debug():
         "role": "client"
     }
     
-    response = requests.post(f"{api_url}/auth/register", json=register_data)
+    response = s.post(f"{api_url}/auth/register", json=register_data)
     if response.status_code != 200:
         print(f"Registration failed: {response.text}")
         return
@@ -35,7 +37,7 @@ def test_svg_debug():
         "longitude": "-74.0060"
     }
     
-    response = requests.post(f"{api_url}/birth-data", json=birth_data, headers=headers)
+    response = s.post(f"{api_url}/birth-data", json=birth_data, headers=headers)
     if response.status_code != 200:
         print(f"Birth data creation failed: {response.text}")
         return
@@ -44,7 +46,7 @@ def test_svg_debug():
     print(f"Created birth data: {birth_data_id}")
     
     # Generate chart
-    response = requests.post(f"{api_url}/astrology/chart?birth_data_id={birth_data_id}", headers=headers)
+    response = s.post(f"{api_url}/astrology/chart?birth_data_id={birth_data_id}", headers=headers)
     if response.status_code != 200:
         print(f"Chart generation failed: {response.text}")
         return
@@ -61,7 +63,7 @@ def test_svg_debug():
         print(f"Chart SVG preview (first 200 chars): {str(chart_svg)[:200]}")
     
     # Test generate-map endpoint
-    response = requests.post(f"{api_url}/charts/{chart_id}/generate-map", headers=headers)
+    response = s.post(f"{api_url}/charts/{chart_id}/generate-map", headers=headers)
     if response.status_code == 200:
         result = response.json()
         print(f"Generate map result: {result}")
@@ -69,7 +71,7 @@ def test_svg_debug():
         print(f"Generate map failed: {response.text}")
     
     # Test SVG retrieval endpoint
-    response = requests.get(f"{api_url}/charts/{chart_id}/svg", headers=headers)
+    response = s.get(f"{api_url}/charts/{chart_id}/svg", headers=headers)
     print(f"SVG retrieval status: {response.status_code}")
     if response.status_code == 200:
         print(f"SVG content length: {len(response.content)}")
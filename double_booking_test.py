@@ -1,11 +1,27 @@
 #!/usr/bin/env python3
 
-import requests
+import aiohttp
+import asyncio
 import sys
-import json
+import orjson
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
+# Days needed to move a date onto a weekday, indexed by weekday (Mon=0..Sun=6):
+# weekdays stay put, Saturday and Sunday roll on to Monday
+_SKIP_TO_MON = (0, 0, 0, 0, 0, 2, 1)
+
+# Length of each booked service, the single source for the sessions' end times
+SERVICE_DURATIONS = {
+    "astrological-tarot-session": timedelta(minutes=60),
+    "general-purpose-reading": timedelta(minutes=45),
+}
+
+def _next_weekday(start: datetime, days_ahead: int = 1) -> datetime:
+    """Return the date days_ahead after start, moved on to Monday if it falls on a weekend"""
+    candidate = start + timedelta(days=days_ahead)
+    return candidate + timedelta(days=_SKIP_TO_MON[candidate.weekday()])
+
 class DoubleBookingTester:
     def __init__(self, base_url="https://astro-reader-1.preview.emergentagent.com"):
         self.base_url = base_url
@@ -15,6 +31,10 @@ class DoubleBookingTester:
         self.tests_run = 0
         self.tests_passed = 0
         self.issues_found = []
+        # One pooled keep-alive session for every call in the run, opened by run_double_booking_tests
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._auth_headers: Optional[Dict[str, str]] = None  # built by _set_token for the current token
+        self._url_cache: Dict[str, str] = {}  # endpoint -> full URL
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test result"""
@@ -38,44 +58,42 @@ class DoubleBookingTester:
         self.issues_found.append(issue)
         print(f"🚨 CRITICAL ISSUE - {issue_type}: {description}")
 
-    def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200) -> tuple:
-        """Make HTTP request and return success status and response"""
-        url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
-        
-        if self.token:
-            headers['Authorization'] = f'Bearer {self.token}'
+    async def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, expected_status: int = 200) -> tuple:
+        """Make HTTP request on the shared session and return success status and response"""
+        if method not in ('GET', 'POST'):
+            return False, {"error": f"Unsupported method: {method}"}
 
-        try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
-            else:
-                return False, {"error": f"Unsupported method: {method}"}
+        url = self._url_cache.get(endpoint)
+        if url is None:
+            url = self._url_cache[endpoint] = f"{self.api_url}/{endpoint}"
 
-            success = response.status_code == expected_status
-            
-            try:
-                response_data = response.json()
-            except:
-                response_data = {"status_code": response.status_code, "text": response.text}
+        try:
+            # Content-Type is a session default, so only the token goes on the request
+            payload = orjson.dumps(data) if data is not None else None
+            async with self.session.request(method, url, data=payload, headers=self._auth_headers) as response:
+                success = response.status == expected_status
+                body = await response.read()
+                
+                try:
+                    response_data = orjson.loads(body)
+                except orjson.JSONDecodeError:
+                    response_data = {"status_code": response.status, "text": body.decode('utf-8', errors='replace')}
 
             return success, response_data
 
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             return False, {"error": str(e)}
 
+    def _set_token(self, token: Optional[str]):
+        """Switch the token sent with requests, building its auth header once"""
+        self.token = token
+        self._auth_headers = {'Authorization': f'Bearer {token}'} if token else None
+
     def get_next_weekday(self, days_ahead=1):
         """Get next weekday (Monday-Friday) for testing"""
-        current = datetime.now()
-        for i in range(days_ahead, days_ahead + 7):
-            test_date = current + timedelta(days=i)
-            if test_date.weekday() < 5:  # Monday=0, Friday=4
-                return test_date
-        return current + timedelta(days=days_ahead)
+        return _next_weekday(datetime.now(), days_ahead)
 
-    def setup_test_user(self):
+    async def setup_test_user(self):
         """Setup test user for testing"""
         test_email = f"double_booking_test_{datetime.now().strftime('%H%M%S')}@celestia.com"
         register_data = {
@@ -85,10 +103,10 @@ class DoubleBookingTester:
             "role": "client"
         }
         
-        success, response = self.make_request('POST', 'auth/register', register_data, 200)
+        success, response = await self.make_request('POST', 'auth/register', register_data, 200)
         
         if success and 'access_token' in response:
-            self.token = response['access_token']
+            self._set_token(response['access_token'])
             self.user_id = response['user']['id']
             self.log_test("Test User Setup", True, f"Created test user: {test_email}")
             return True
@@ -96,27 +114,27 @@ class DoubleBookingTester:
             self.log_test("Test User Setup", False, "Failed to create test user")
             return False
 
-    def test_double_booking_same_user(self):
+    async def test_double_booking_same_user(self):
         """Test if the same user can create overlapping sessions"""
         print("\n📅 DOUBLE BOOKING TEST: Same User, Same Time Slot")
         
         # Get next weekday
         test_date = self.get_next_weekday(1)
         start_time = test_date.replace(hour=11, minute=0, second=0, microsecond=0)  # 11:00 AM
-        end_time = start_time + timedelta(hours=1)  # 12:00 PM
+        end_time = start_time + SERVICE_DURATIONS["astrological-tarot-session"]  # 12:00 PM
         
         print(f"📅 Testing on {test_date.strftime('%A, %Y-%m-%d')} from 11:00 AM to 12:00 PM")
         
         # Create first session
         session_data = {
-            "service_type": "astrological-tarot-session",  # 60 minutes
+            "service_type": "astrological-tarot-session",
             "start_at": start_time.isoformat(),
             "end_at": end_time.isoformat(),
             "client_message": "First session - should succeed"
         }
         
         print("🔄 Creating first session...")
-        success1, response1 = self.make_request('POST', 'sessions', session_data, 200)
+        success1, response1 = await self.make_request('POST', 'sessions', session_data, 200)
         
         if success1 and 'id' in response1:
             first_session_id = response1['id']
@@ -126,7 +144,7 @@ class DoubleBookingTester:
             
             # Complete payment to confirm the session
             print("💳 Completing payment for first session...")
-            success_payment, payment_response = self.make_request('POST', f'sessions/{first_session_id}/payment/complete', None, 200)
+            success_payment, payment_response = await self.make_request('POST', f'sessions/{first_session_id}/payment/complete', None, 200)
             
             if success_payment:
                 print("✅ First session payment completed - time slot should now be blocked")
@@ -134,13 +152,13 @@ class DoubleBookingTester:
                 # Try to create second session with exact same time
                 print("🔄 Attempting to create overlapping session...")
                 overlapping_data = {
-                    "service_type": "general-purpose-reading",  # 45 minutes
+                    "service_type": "general-purpose-reading",
                     "start_at": start_time.isoformat(),  # Same start time
-                    "end_at": (start_time + timedelta(minutes=45)).isoformat(),  # Overlaps
+                    "end_at": (start_time + SERVICE_DURATIONS["general-purpose-reading"]).isoformat(),  # Overlaps
                     "client_message": "Second session - should be rejected due to overlap"
                 }
                 
-                success2, response2 = self.make_request('POST', 'sessions', overlapping_data, 200)
+                success2, response2 = await self.make_request('POST', 'sessions', overlapping_data, 200)
                 
                 if not success2:
                     error_message = str(response2).lower()
@@ -171,7 +189,7 @@ class DoubleBookingTester:
                          f"Failed to create first session: {response1}")
             return False
 
-    def test_double_booking_different_users(self):
+    async def test_double_booking_different_users(self):
         """Test if different users can create overlapping sessions"""
         print("\n👥 DOUBLE BOOKING TEST: Different Users, Same Time Slot")
         
@@ -184,7 +202,7 @@ class DoubleBookingTester:
             "role": "client"
         }
         
-        success_reg, response_reg = self.make_request('POST', 'auth/register', register_data2, 200)
+        success_reg, response_reg = await self.make_request('POST', 'auth/register', register_data2, 200)
         
         if not success_reg:
             self.log_test("Second User Registration", False, "Failed to create second user")
@@ -196,7 +214,7 @@ class DoubleBookingTester:
         # Get next weekday
         test_date = self.get_next_weekday(2)
         start_time = test_date.replace(hour=13, minute=0, second=0, microsecond=0)  # 1:00 PM
-        end_time = start_time + timedelta(hours=1)  # 2:00 PM
+        end_time = start_time + SERVICE_DURATIONS["astrological-tarot-session"]  # 2:00 PM
         
         print(f"📅 Testing on {test_date.strftime('%A, %Y-%m-%d')} from 1:00 PM to 2:00 PM")
         
@@ -209,35 +227,35 @@ class DoubleBookingTester:
         }
         
         print("🔄 First user creating session...")
-        success1, response1 = self.make_request('POST', 'sessions', session_data, 200)
+        success1, response1 = await self.make_request('POST', 'sessions', session_data, 200)
         
         if success1 and 'id' in response1:
             first_session_id = response1['id']
             print(f"✅ First user session created: {first_session_id}")
             
             # Complete payment
-            success_payment, _ = self.make_request('POST', f'sessions/{first_session_id}/payment/complete', None, 200)
+            success_payment, _ = await self.make_request('POST', f'sessions/{first_session_id}/payment/complete', None, 200)
             
             if success_payment:
                 print("✅ First user payment completed")
                 
                 # Switch to second user token
                 original_token = self.token
-                self.token = second_token
+                self._set_token(second_token)
                 
                 # Second user tries to create overlapping session
                 print("🔄 Second user attempting overlapping session...")
                 overlapping_data = {
                     "service_type": "general-purpose-reading",
                     "start_at": start_time.isoformat(),  # Same time
-                    "end_at": (start_time + timedelta(minutes=45)).isoformat(),
+                    "end_at": (start_time + SERVICE_DURATIONS["general-purpose-reading"]).isoformat(),
                     "client_message": "Second user overlapping session - should be rejected"
                 }
                 
-                success2, response2 = self.make_request('POST', 'sessions', overlapping_data, 200)
+                success2, response2 = await self.make_request('POST', 'sessions', overlapping_data, 200)
                 
                 # Restore original token
-                self.token = original_token
+                self._set_token(original_token)
                 
                 if not success2:
                     error_message = str(response2).lower()
@@ -267,13 +285,13 @@ class DoubleBookingTester:
                          f"Failed to create first user session: {response1}")
             return False
 
-    def test_partial_overlap_scenarios(self):
+    async def test_partial_overlap_scenarios(self):
         """Test various partial overlap scenarios"""
         print("\n⏰ PARTIAL OVERLAP SCENARIOS TEST")
         
         test_date = self.get_next_weekday(3)
         base_start = test_date.replace(hour=14, minute=0, second=0, microsecond=0)  # 2:00 PM
-        base_end = base_start + timedelta(hours=1)  # 3:00 PM
+        base_end = base_start + SERVICE_DURATIONS["astrological-tarot-session"]  # 3:00 PM
         
         # Create base session
         base_session_data = {
@@ -284,7 +302,7 @@ class DoubleBookingTester:
         }
         
         print(f"📅 Creating base session: {base_start.strftime('%I:%M %p')} - {base_end.strftime('%I:%M %p')}")
-        success_base, response_base = self.make_request('POST', 'sessions', base_session_data, 200)
+        success_base, response_base = await self.make_request('POST', 'sessions', base_session_data, 200)
         
         if not success_base:
             self.log_test("Base Session Creation", False, "Failed to create base session")
@@ -294,7 +312,7 @@ class DoubleBookingTester:
         print(f"✅ Base session created: {base_session_id}")
         
         # Complete payment
-        self.make_request('POST', f'sessions/{base_session_id}/payment/complete', None, 200)
+        await self.make_request('POST', f'sessions/{base_session_id}/payment/complete', None, 200)
         print("✅ Base session payment completed")
         
         # Test various overlap scenarios
@@ -310,22 +328,33 @@ class DoubleBookingTester:
         
         overlap_errors = 0
         
+        # Work out every candidate's slot and request body in one pass before any I/O
+        prepared = []
         for start_offset, duration, description, should_be_rejected in overlap_scenarios:
             test_start = base_start + timedelta(minutes=start_offset)
             test_end = test_start + timedelta(minutes=duration)
-            
-            print(f"\n🔍 Testing: {description}")
-            print(f"   Time: {test_start.strftime('%I:%M %p')} - {test_end.strftime('%I:%M %p')}")
-            print(f"   Expected: {'REJECTION' if should_be_rejected else 'ACCEPTANCE'}")
-            
             overlap_session_data = {
                 "service_type": "general-purpose-reading",
                 "start_at": test_start.isoformat(),
                 "end_at": test_end.isoformat(),
                 "client_message": f"Testing overlap: {description}"
             }
-            
-            success, response = self.make_request('POST', 'sessions', overlap_session_data, 200)
+            prepared.append((description, should_be_rejected, test_start, test_end, overlap_session_data))
+        
+        async def probe(candidate):
+            """Book one prepared overlap candidate and return it with the outcome"""
+            description, should_be_rejected, test_start, test_end, overlap_session_data = candidate
+            success, response = await self.make_request('POST', 'sessions', overlap_session_data, 200)
+            return description, should_be_rejected, test_start, test_end, success, response
+        
+        # The candidates only depend on the paid base session, so they are probed concurrently;
+        # the outcomes are reported (and counted) afterwards, in order
+        results = await asyncio.gather(*(probe(candidate) for candidate in prepared))
+        
+        for description, should_be_rejected, test_start, test_end, success, response in results:
+            print(f"\n🔍 Testing: {description}")
+            print(f"   Time: {test_start.strftime('%I:%M %p')} - {test_end.strftime('%I:%M %p')}")
+            print(f"   Expected: {'REJECTION' if should_be_rejected else 'ACCEPTANCE'}")
             
             if should_be_rejected:
                 if not success:
@@ -351,25 +380,32 @@ class DoubleBookingTester:
                          f"Found {overlap_errors} overlap handling errors")
             return False
 
-    def run_double_booking_tests(self):
+    async def run_double_booking_tests(self):
         """Run all double booking tests"""
         print("📅 Starting Double Booking Investigation...")
         print("=" * 60)
         
+        connector = aiohttp.TCPConnector(limit=20, limit_per_host=20)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30, connect=5),
+                                         headers={'Content-Type': 'application/json'}) as self.session:
+            return await self._run_double_booking_tests()
+
+    async def _run_double_booking_tests(self):
+        """Run the tests once the shared session is open"""
         # Setup
-        if not self.setup_test_user():
+        if not await self.setup_test_user():
             print("❌ Failed to setup test user - stopping investigation")
             return False
         
         # Run tests
         print("\n" + "=" * 60)
-        self.test_double_booking_same_user()
+        await self.test_double_booking_same_user()
         
         print("\n" + "=" * 60)
-        self.test_double_booking_different_users()
+        await self.test_double_booking_different_users()
         
         print("\n" + "=" * 60)
-        self.test_partial_overlap_scenarios()
+        await self.test_partial_overlap_scenarios()
         
         # Summary
         print("\n" + "=" * 60)
@@ -394,7 +430,7 @@ class DoubleBookingTester:
 
 def main():
     tester = DoubleBookingTester()
-    success = tester.run_double_booking_tests()
+    success = asyncio.run(tester.run_double_booking_tests())
     
     return 0 if success else 1
 